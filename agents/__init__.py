@@ -1,16 +1,30 @@
 """Agent modules for Travel Photo Organization Workflow."""
 
-from .metadata_extraction import MetadataExtractionAgent
-from .quality_assessment import QualityAssessmentAgent
-from .aesthetic_assessment import AestheticAssessmentAgent
-from .filtering_categorization import FilteringCategorizationAgent
-from .caption_generation import CaptionGenerationAgent
+import importlib
+
 import dotenv
 dotenv.load_dotenv()
-__all__ = [
-    'MetadataExtractionAgent',
-    'QualityAssessmentAgent',
-    'AestheticAssessmentAgent',
-    'FilteringCategorizationAgent',
-    'CaptionGenerationAgent'
-]
+
+# Agents are imported on first access so that importing one agent module does
+# not pull in the Gemini client and vision libraries needed by the others
+_AGENT_MODULES = {
+    'MetadataExtractionAgent': '.metadata_extraction',
+    'QualityAssessmentAgent': '.quality_assessment',
+    'AestheticAssessmentAgent': '.aesthetic_assessment',
+    'FilteringCategorizationAgent': '.filtering_categorization',
+    'CaptionGenerationAgent': '.caption_generation'
+}
+
+__all__ = list(_AGENT_MODULES)
+
+
+def __getattr__(name):
+    if name not in _AGENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    agent_class = getattr(importlib.import_module(_AGENT_MODULES[name], __name__), name)
+    globals()[name] = agent_class
+    return agent_class
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
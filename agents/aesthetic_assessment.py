@@ -1,23 +1,57 @@
 """Agent 3: Aesthetic Assessment - Evaluate artistic and aesthetic quality."""
 
+import asyncio
+import hashlib
 import logging
 import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import base64
-import json
-import re
 import io
 
+import cv2
+import imagehash
+import numpy as np
 from PIL import Image
-from google import genai
 from google.genai import types
 
+from utils.clip_aesthetic import ClipAestheticScorer, score_to_rating
+from utils.helpers import find_json, retry_async, run_coroutine_sync
+from utils.genai_client import get_async_genai_client, get_genai_client
 from utils.logger import log_error, log_info, log_warning
 from utils.validation import validate_agent_output, create_validation_summary
 from utils.heic_reader import is_heic_file, open_heic_with_pil
-from utils.token_tracker import TokenTracker, resize_image_for_api, get_optimized_media_type
+from utils.rate_limiter import RateLimiter
+from utils.resize_cache import ResizedImageCache
+from utils.response_cache import ResponseCache
+from utils.token_tracker import TokenTracker, get_optimized_media_type, get_upload_media_type
+
+_PARSE_ERROR_PREFIX = "Parse error: "
+
+# Shared read-only default for missing or null metadata sections
+_EMPTY: Dict[str, Any] = {}
+
+# Structured-output schema so Gemini returns exactly the fields we score
+_SCORE_SCHEMA = types.Schema(type=types.Type.INTEGER, minimum=1, maximum=5)
+_ASSESSMENT_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "composition": _SCORE_SCHEMA,
+        "framing": _SCORE_SCHEMA,
+        "lighting": _SCORE_SCHEMA,
+        "subject_interest": _SCORE_SCHEMA,
+        "notes": types.Schema(type=types.Type.STRING)
+    },
+    required=["composition", "framing", "lighting", "subject_interest", "notes"],
+    property_ordering=["composition", "framing", "lighting", "subject_interest", "notes"]
+)
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """Count set bits per element of a uint64 array (Hamming distance of XORed hashes)."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    # NumPy < 2.0
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
 
 
 class AestheticAssessmentAgent:
@@ -73,6 +107,25 @@ Respond with ONLY valid JSON."""
         self.logger = logger
         self.agent_config = config.get('agents', {}).get('aesthetic_assessment', {})
         self.parallel_workers = self.agent_config.get('parallel_workers', 2)
+        self.vlm_batch_size = max(1, self.agent_config.get('vlm_batch_size', 1))
+        self.fuzzy_dedup_enabled = self.agent_config.get('fuzzy_dedup_enabled', False)
+        self.fuzzy_dedup_max_distance = self.agent_config.get('fuzzy_dedup_max_distance', 5)
+
+        # Local pre-filter for obviously unusable shots (blurred, blank, black)
+        prefilter_config = self.agent_config.get('prefilter', {})
+        self.prefilter_enabled = prefilter_config.get('enabled', False)
+        self.prefilter_min_sharpness = prefilter_config.get('min_sharpness', 50)
+        self.prefilter_min_contrast = prefilter_config.get('min_contrast', 10)
+        self.prefilter_brightness_range = prefilter_config.get('brightness_range', [15, 240])
+
+        # Retry settings for transient API failures (rate limits, 5xx, timeouts)
+        error_config = config.get('error_handling', {})
+        self.max_retries = error_config.get('max_retries', 3)
+        self.retry_delay = error_config.get('retry_delay_seconds', 2)
+
+        # Pace requests to the Gemini quota (0 = unlimited)
+        requests_per_minute = self.agent_config.get('requests_per_minute', 0)
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=self.parallel_workers) if requests_per_minute > 0 else None
 
         # Configure Gemini API
         self.api_config = config.get('api', {}).get('google', {})
@@ -83,16 +136,28 @@ Respond with ONLY valid JSON."""
 
         # Initialize Vertex AI client
         try:
-            self.client = genai.Client(
-                vertexai=True,
-                project=self.api_config.get('project'),
-                location=self.api_config.get('location', 'us-central1')
+            self.client = get_genai_client(
+                self.api_config.get('project'),
+                self.api_config.get('location', 'us-central1')
             )
-            log_info(self.logger, f"Initialized Vertex AI client for project {self.api_config.get('project')}", "Aesthetic Assessment")
+            log_info(self.logger, "Initialized Vertex AI client for project %s", "Aesthetic Assessment", self.api_config.get('project'))
         except Exception as e:
-            log_warning(self.logger, f"Failed to initialize Vertex AI client: {e}", "Aesthetic Assessment")
+            log_warning(self.logger, "Failed to initialize Vertex AI client: %s", "Aesthetic Assessment", e)
             self.client = None
 
+        # Optional local scorer replacing Gemini calls ('gemini' or 'clip_local')
+        self.local_scorer = None
+        if self.agent_config.get('backend', 'gemini') == 'clip_local':
+            try:
+                self.local_scorer = ClipAestheticScorer(
+                    self.agent_config['clip_weights_path'],
+                    device=self.agent_config.get('clip_device'),
+                    batch_size=self.agent_config.get('clip_batch_size', 32)
+                )
+                log_info(self.logger, "Using local CLIP aesthetic scorer", "Aesthetic Assessment")
+            except Exception as e:
+                log_warning(self.logger, "Failed to load local CLIP scorer, using Gemini: %s", "Aesthetic Assessment", e)
+
         # Token tracking setup
         pricing_config = self.api_config.get('pricing', {})
         pricing = {
@@ -104,14 +169,77 @@ Respond with ONLY valid JSON."""
         # Optimization settings
         self.optimization = self.api_config.get('optimization', {})
         self.enable_resizing = self.optimization.get('enable_image_resizing', True)
-        self.max_dimension = self.optimization.get('max_image_dimension', 1024)
+        self.max_dimension = self.agent_config.get('vlm_max_dim', self.optimization.get('max_image_dimension', 1024))
         self.jpeg_quality = self.optimization.get('jpeg_quality', 85)
+        self.upload_format = 'WEBP' if self.optimization.get('use_webp', False) else 'JPEG'
         self.use_concise_prompts = self.optimization.get('use_concise_prompts', True)
 
         # Select prompt based on optimization setting
         self.SYSTEM_PROMPT = self.SYSTEM_PROMPT_CONCISE if self.use_concise_prompts else self.SYSTEM_PROMPT_FULL
+        self._build_prompt_templates()
+
+        # Structured output: bare JSON of the assessment shape, no surrounding prose
+        self._generation_config = types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=_ASSESSMENT_SCHEMA
+        )
+        self._batch_generation_config = types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=types.Schema(type=types.Type.ARRAY, items=_ASSESSMENT_SCHEMA)
+        )
+
+        # Reuse earlier responses for unchanged images and prompts
+        performance_config = config.get('performance', {})
+        self.response_cache = ResponseCache(
+            performance_config.get('cache_dir', './cache'),
+            'aesthetic_assessment',
+            logger=self.logger,
+            enabled=performance_config.get('cache_vlm_responses', True)
+        )
+        self.resize_cache = ResizedImageCache(
+            performance_config.get('cache_dir', './cache'),
+            enabled=performance_config.get('cache_resized_images', True),
+            max_size_mb=performance_config.get('resize_cache_max_mb', 500)
+        )
+        # Near-duplicate pHashes, reused across runs for unchanged files
+        self.hash_cache = ResponseCache(
+            performance_config.get('cache_dir', './cache'),
+            'perceptual_hash',
+            logger=self.logger,
+            enabled=performance_config.get('cache_perceptual_hashes', True)
+        )
+
+    def _load_image_bytes(self, image_path: Path) -> tuple[bytes, str]:
+        """
+        Read (and optionally resize) an image for upload.
+
+        Blocking disk and PIL work; run via asyncio.to_thread from async code.
+
+        Args:
+            image_path: Path to image
+
+        Returns:
+            Tuple of (image_bytes, media_type)
+        """
+        # Use optimized image resizing if enabled
+        if self.enable_resizing:
+            try:
+                image_bytes = self.resize_cache.get_or_resize(
+                    image_path,
+                    max_dimension=self.max_dimension,
+                    quality=self.jpeg_quality,
+                    image_format=self.upload_format
+                )
+                return image_bytes, get_upload_media_type(self.upload_format)
+            except Exception as e:
+                log_warning(self.logger, "Failed to resize %s, using original: %s", "Aesthetic Assessment", image_path.name, e)
+
+        # Read original image (or fall back to it)
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        return image_bytes, get_optimized_media_type(image_path)
 
-    def _call_vlm_api(self, image_path: Path, prompt: str, image_id: str = None) -> Dict[str, Any]:
+    async def _call_vlm_api(self, image_path: Path, prompt: str, image_id: str = None) -> Dict[str, Any]:
         """
         Call Gemini Vision API for aesthetic assessment.
 
@@ -124,49 +252,45 @@ Respond with ONLY valid JSON."""
             Assessment scores and notes
         """
         try:
-            # Use optimized image resizing if enabled
-            if self.enable_resizing:
-                try:
-                    image_bytes = resize_image_for_api(
-                        image_path,
-                        max_dimension=self.max_dimension,
-                        quality=self.jpeg_quality
-                    )
-                    media_type = get_optimized_media_type(image_path)
-                    log_info(self.logger, f"Resized image for API (max_dim={self.max_dimension}): {image_path.name}", "Aesthetic Assessment")
-                except Exception as e:
-                    log_warning(self.logger, f"Failed to resize image, using original: {e}", "Aesthetic Assessment")
-                    # Fallback to original
-                    with open(image_path, 'rb') as f:
-                        image_bytes = f.read()
-                    media_type = get_optimized_media_type(image_path)
-            else:
-                # Read original image
-                with open(image_path, 'rb') as f:
-                    image_bytes = f.read()
-                media_type = get_optimized_media_type(image_path)
+            # Read off the event loop so disk I/O overlaps in-flight API calls
+            image_bytes, media_type = await asyncio.to_thread(self._load_image_bytes, image_path)
+
+            cache_key = ResponseCache.make_key(image_bytes, self.model_name, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                log_info(self.logger, "Using cached assessment for %s", "Aesthetic Assessment", image_path.name)
+                return cached
+
+            if self.prefilter_enabled:
+                prefiltered = await asyncio.to_thread(self._prefilter_assessment, image_bytes)
+                if prefiltered is not None:
+                    log_info(self.logger, "Pre-filtered %s: %s", "Aesthetic Assessment", image_path.name, prefiltered['notes'])
+                    return prefiltered
 
             # Call Gemini Vision API via Vertex AI
             if not self.client:
                 raise Exception("Vertex AI client not initialized")
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
+            response = await self._generate_content(
+                [
                     types.Part.from_text(text=prompt),
                     types.Part.from_bytes(
                         data=image_bytes,
                         mime_type=media_type
                     )
-                ]
+                ],
+                self._generation_config,
+                image_path.name
             )
 
             # Parse response
             response_text = response.text
-            log_info(self.logger, f"Received Gemini response for {image_path.name}", "Aesthetic Assessment")
+            log_info(self.logger, "Received Gemini response for %s", "Aesthetic Assessment", image_path.name)
 
             # Extract JSON from response
             assessment = self._parse_vlm_response(response_text)
+            if not assessment['notes'].startswith(_PARSE_ERROR_PREFIX):
+                self.response_cache.set(cache_key, assessment)
 
             # Track token usage and calculate cost
             if hasattr(response, 'usage_metadata'):
@@ -178,9 +302,11 @@ Respond with ONLY valid JSON."""
                 if cost_config.get('log_per_image', True):
                     log_info(
                         self.logger,
-                        f"Token cost for {image_path.name}: ${usage_record['estimated_cost_usd']:.4f} "
-                        f"({usage_record['total_token_count']} tokens)",
-                        "Aesthetic Assessment"
+                        "Token cost for %s: $%.4f (%d tokens)",
+                        "Aesthetic Assessment",
+                        image_path.name,
+                        usage_record['estimated_cost_usd'],
+                        usage_record['total_token_count']
                     )
 
             return assessment
@@ -203,6 +329,194 @@ Respond with ONLY valid JSON."""
                 "notes": f"API error: {str(e)}"
             }
 
+    async def _generate_content(
+        self,
+        contents: List[types.Part],
+        generation_config: types.GenerateContentConfig,
+        label: str
+    ) -> types.GenerateContentResponse:
+        """
+        Send a request to Gemini, retrying transient failures with backoff.
+
+        Args:
+            contents: Request parts
+            generation_config: Generation config with the response schema
+            label: Description of the request for log messages
+
+        Returns:
+            Gemini response
+        """
+        def log_retry(attempt: int, delay: float, error: Exception):
+            log_warning(
+                self.logger,
+                "Gemini request for %s failed (%s), retry %d/%d in %.1fs",
+                "Aesthetic Assessment",
+                label,
+                error,
+                attempt,
+                self.max_retries,
+                delay
+            )
+
+        async def send() -> types.GenerateContentResponse:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            client = get_async_genai_client(
+                self.api_config.get('project'),
+                self.api_config.get('location', 'us-central1')
+            )
+            return await client.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=generation_config
+            )
+
+        return await retry_async(
+            send,
+            max_retries=self.max_retries,
+            base_delay=self.retry_delay,
+            on_retry=log_retry
+        )
+
+    async def _call_vlm_api_batch(self, image_paths: List[Path], image_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Call Gemini Vision API once for several images.
+
+        Unlike _call_vlm_api, failures are raised so the caller can fall back
+        to per-image requests. Images with a cached response are not sent.
+
+        Args:
+            image_paths: Paths to images
+            image_ids: Image identifiers for token tracking
+
+        Returns:
+            Assessment scores and notes, aligned with image_paths
+        """
+        loaded = await asyncio.gather(
+            *(asyncio.to_thread(self._load_image_bytes, path) for path in image_paths)
+        )
+
+        # Batched images share the concise single-image cache entries
+        single_prompt = self._build_prompt({})
+        cache_keys = [
+            ResponseCache.make_key(image_bytes, self.model_name, single_prompt)
+            for image_bytes, _ in loaded
+        ]
+        assessments = [self.response_cache.get(key) for key in cache_keys]
+        pending = [index for index, assessment in enumerate(assessments) if assessment is None]
+
+        if len(pending) < len(image_paths):
+            log_info(
+                self.logger,
+                "Using cached assessments for %d of %d images",
+                "Aesthetic Assessment",
+                len(image_paths) - len(pending),
+                len(image_paths)
+            )
+
+        if self.prefilter_enabled and pending:
+            prefiltered = await asyncio.gather(
+                *(asyncio.to_thread(self._prefilter_assessment, loaded[index][0]) for index in pending)
+            )
+            for index, assessment in zip(pending, prefiltered):
+                assessments[index] = assessment
+            pending = [index for index in pending if assessments[index] is None]
+
+        if not pending:
+            return assessments
+
+        if not self.client:
+            raise Exception("Vertex AI client not initialized")
+
+        contents = [types.Part.from_text(text=self._build_batch_prompt(len(pending)))]
+        for label, index in enumerate(pending, start=1):
+            image_bytes, media_type = loaded[index]
+            contents.append(types.Part.from_text(text=f"Image {label}:"))
+            contents.append(types.Part.from_bytes(data=image_bytes, mime_type=media_type))
+
+        response = await self._generate_content(
+            contents,
+            self._batch_generation_config,
+            f"batch of {len(pending)} images"
+        )
+
+        response_text = response.text
+        log_info(self.logger, "Received Gemini batch response for %d images", "Aesthetic Assessment", len(pending))
+
+        response_items = find_json(response_text, '[')
+        if response_items is None:
+            raise ValueError("No JSON array found in batch response")
+
+        if not isinstance(response_items, list) or len(response_items) != len(pending):
+            raise ValueError(f"Expected {len(pending)} assessments in batch response")
+
+        for index, item in zip(pending, response_items):
+            assessments[index] = self._build_assessment(item, response_text)
+            self.response_cache.set(cache_keys[index], assessments[index])
+
+        # Track token usage, split evenly across the images actually sent
+        if hasattr(response, 'usage_metadata'):
+            usage_records = self.token_tracker.track_batch_usage(
+                response.usage_metadata,
+                [image_ids[index] for index in pending]
+            )
+            for index, usage_record in zip(pending, usage_records):
+                assessments[index]['token_usage'] = usage_record
+
+            cost_config = self.config.get('cost_tracking', {})
+            if cost_config.get('log_per_image', True):
+                log_info(
+                    self.logger,
+                    "Token cost for batch of %d images: $%.4f",
+                    "Aesthetic Assessment",
+                    len(pending),
+                    sum(record['estimated_cost_usd'] for record in usage_records)
+                )
+
+        return assessments
+
+    def _prefilter_assessment(self, image_bytes: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Score obviously unusable shots locally instead of calling Gemini.
+
+        Uses Laplacian variance for blur, grayscale standard deviation for
+        blank frames and mean brightness for black or blown-out frames.
+
+        Args:
+            image_bytes: Image bytes as they would be uploaded
+
+        Returns:
+            Low-score assessment if a threshold is breached, otherwise None
+        """
+        gray = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            # Not decodable by OpenCV (e.g. HEIC sent as-is); let Gemini judge it
+            return None
+
+        sharpness = cv2.Laplacian(gray, cv2.CV_32F).var()
+        brightness = gray.mean()
+        contrast = gray.std()
+
+        min_brightness, max_brightness = self.prefilter_brightness_range
+        if contrast < self.prefilter_min_contrast:
+            reason = f"blank frame (contrast {contrast:.1f})"
+        elif not min_brightness <= brightness <= max_brightness:
+            reason = f"{'underexposed' if brightness < min_brightness else 'overexposed'} (brightness {brightness:.0f})"
+        elif sharpness < self.prefilter_min_sharpness:
+            reason = f"blurred (sharpness {sharpness:.1f})"
+        else:
+            return None
+
+        return {
+            "composition": 1,
+            "framing": 1,
+            "lighting": 2 if contrast >= self.prefilter_min_contrast else 1,
+            "subject_interest": 1,
+            "overall_aesthetic": 1,
+            "notes": f"Pre-filter: {reason}",
+            "prefiltered": True
+        }
+
     def _parse_vlm_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse Gemini Vision API response to extract aesthetic scores.
@@ -214,92 +528,96 @@ Respond with ONLY valid JSON."""
             Dictionary with aesthetic scores
         """
         try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                response_json = json.loads(json_match.group())
-            else:
-                # If no JSON found, parse the text response
-                response_json = self._extract_scores_from_text(response_text)
+            # Structured output guarantees a JSON object; find_json also
+            # tolerates stray text around it
+            response_json = find_json(response_text)
+            if not isinstance(response_json, dict):
+                raise ValueError("No JSON object found in response")
 
-            # Ensure all required fields are present
-            assessment = {
-                "composition": int(response_json.get("composition", 3)),
-                "framing": int(response_json.get("framing", 3)),
-                "lighting": int(response_json.get("lighting", 3)),
-                "subject_interest": int(response_json.get("subject_interest", 3)),
-                "notes": response_json.get("notes", response_text[:200])
-            }
-
-            # Clamp scores to 1-5 range
-            for key in ["composition", "framing", "lighting", "subject_interest"]:
-                assessment[key] = max(1, min(5, assessment[key]))
-
-            # Calculate overall aesthetic as weighted average
-            assessment["overall_aesthetic"] = int(round(
-                (assessment["composition"] * 0.30 +
-                 assessment["framing"] * 0.25 +
-                 assessment["lighting"] * 0.25 +
-                 assessment["subject_interest"] * 0.20)
-            ))
-
-            return assessment
+            return self._build_assessment(response_json, response_text)
 
         except Exception as e:
-            log_warning(self.logger, f"Failed to parse VLM response: {str(e)}", "Aesthetic Assessment")
+            log_warning(self.logger, "Failed to parse VLM response: %s", "Aesthetic Assessment", e)
             return {
                 "composition": 3,
                 "framing": 3,
                 "lighting": 3,
                 "subject_interest": 3,
                 "overall_aesthetic": 3,
-                "notes": f"Parse error: {str(e)}"
+                "notes": f"{_PARSE_ERROR_PREFIX}{str(e)}"
             }
 
-    def _extract_scores_from_text(self, text: str) -> Dict[str, Any]:
+    def _build_assessment(self, response_json: Dict[str, Any], response_text: str) -> Dict[str, Any]:
         """
-        Extract scores from natural language response.
+        Normalize parsed scores into an assessment dictionary.
 
         Args:
-            text: Natural language response text
+            response_json: Scores parsed from the response
+            response_text: Raw response text (used for fallback notes)
 
         Returns:
-            Dictionary with extracted scores
-        """
-        scores = {}
-        score_patterns = {
-            "composition": r"composition[:\s]*(\d)",
-            "framing": r"framing[:\s]*(\d)",
-            "lighting": r"lighting[:\s]*(\d)",
-            "subject_interest": r"subject.?interest[:\s]*(\d)"
+            Dictionary with clamped scores and weighted overall aesthetic
+        """
+        # Ensure all required fields are present
+        assessment = {
+            "composition": int(response_json.get("composition", 3)),
+            "framing": int(response_json.get("framing", 3)),
+            "lighting": int(response_json.get("lighting", 3)),
+            "subject_interest": int(response_json.get("subject_interest", 3)),
+            "notes": response_json.get("notes")
         }
-
-        for key, pattern in score_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                scores[key] = int(match.group(1))
-
-        scores["notes"] = text[:200]
-        return scores
-
-    def assess_with_vlm(self, image_path: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        if assessment["notes"] is None:
+            # Only slice the raw text when the model omitted notes
+            assessment["notes"] = response_text[:200]
+
+        # Clamp scores to 1-5 range
+        for key in ["composition", "framing", "lighting", "subject_interest"]:
+            assessment[key] = max(1, min(5, assessment[key]))
+
+        # Calculate overall aesthetic as weighted average (30/25/25/20),
+        # in integer percent so halves always round up
+        assessment["overall_aesthetic"] = max(1, min(5, (
+            assessment["composition"] * 30 +
+            assessment["framing"] * 25 +
+            assessment["lighting"] * 25 +
+            assessment["subject_interest"] * 20 + 50
+        ) // 100))
+
+        return assessment
+
+    def _build_prompt(self, metadata: Dict[str, Any]) -> str:
         """
-        Assess image aesthetics using VLM.
+        Build the single-image assessment prompt.
+
+        Only the metadata block varies per image; the rest comes from the
+        templates built in _build_prompt_templates().
 
         Args:
-            image_path: Path to image file
-            metadata: Image metadata
+            metadata: Image metadata (only used by the full prompt)
 
         Returns:
-            Aesthetic assessment dictionary
+            Prompt text
         """
-        try:
-            image_id = metadata.get('image_id', image_path.stem)
+        if self.use_concise_prompts:
+            return self._prompt_concise
 
-            # Construct prompt (concise if optimization enabled, detailed otherwise)
-            if self.use_concise_prompts:
-                # Optimized concise prompt (reduces input tokens by ~80%)
-                prompt = f"""{self.SYSTEM_PROMPT}
+        gps = metadata.get('gps') or _EMPTY
+        camera_settings = metadata.get('camera_settings') or _EMPTY
+        metadata_block = f"""Image metadata:
+- Capture time: {metadata.get('capture_datetime', 'unknown')}
+- Location: {gps.get('latitude', 'unknown')}, {gps.get('longitude', 'unknown')}
+- Camera: {camera_settings.get('camera_model', 'unknown')}
+- ISO: {camera_settings.get('iso', 'unknown')}
+- Aperture: {camera_settings.get('aperture', 'unknown')}
+- Focal length: {camera_settings.get('focal_length', 'unknown')}
+
+"""
+        return self._prompt_prefix + metadata_block + self._prompt_suffix
+
+    def _build_prompt_templates(self):
+        """Build the invariant prompt text once so only metadata is formatted per image."""
+        # Optimized concise prompt (reduces input tokens by ~80%)
+        self._prompt_concise = f"""{self.SYSTEM_PROMPT}
 
 {{
     "composition": <1-5>,
@@ -308,12 +626,9 @@ Respond with ONLY valid JSON."""
     "subject_interest": <1-5>,
     "notes": "<brief analysis>"
 }}"""
-            else:
-                # Full detailed prompt
-                gps = metadata.get('gps', {})
-                location = f"{gps.get('latitude', 'unknown')}, {gps.get('longitude', 'unknown')}"
 
-                prompt = f"""{self.SYSTEM_PROMPT}
+        # Full detailed prompt, split around the per-image metadata block
+        self._prompt_prefix = f"""{self.SYSTEM_PROMPT}
 
 TASK: Analyze this travel photograph and provide aesthetic assessment scores.
 
@@ -323,41 +638,41 @@ Evaluate the image across these dimensions:
 3. Lighting Quality (1-5): Direction, color temperature, mood, golden/blue hour quality
 4. Subject Interest (1-5): Uniqueness, emotional impact, storytelling potential
 
-Image metadata:
-- Capture time: {metadata.get('capture_datetime', 'unknown')}
-- Location: {location}
-- Camera: {metadata.get('camera_settings', {}).get('camera_model', 'unknown')}
-- ISO: {metadata.get('camera_settings', {}).get('iso', 'unknown')}
-- Aperture: {metadata.get('camera_settings', {}).get('aperture', 'unknown')}
-- Focal length: {metadata.get('camera_settings', {}).get('focal_length', 'unknown')}
-
-RESPONSE FORMAT: Provide your response as a JSON object with this exact structure:
-{{
+"""
+        self._prompt_suffix = """RESPONSE FORMAT: Provide your response as a JSON object with this exact structure:
+{
     "composition": <1-5>,
     "framing": <1-5>,
     "lighting": <1-5>,
     "subject_interest": <1-5>,
     "notes": "<brief analysis of aesthetic strengths and weaknesses>"
-}}
+}
 
 Be specific and reference the actual visual elements you observe in the photograph."""
 
+    async def assess_with_vlm(self, image_path: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Assess image aesthetics using VLM.
+
+        Args:
+            image_path: Path to image file
+            metadata: Image metadata
+
+        Returns:
+            Aesthetic assessment dictionary
+        """
+        try:
+            image_id = metadata.get('image_id', image_path.stem)
+
+            prompt = self._build_prompt(metadata)
+
             # Call VLM API with token tracking
-            assessment = self._call_vlm_api(image_path, prompt, image_id)
+            assessment = await self._call_vlm_api(image_path, prompt, image_id)
 
             # Add image_id
             assessment['image_id'] = metadata['image_id']
 
-            # Validate output
-            is_valid, error_msg = validate_agent_output("aesthetic_assessment", assessment)
-            if not is_valid:
-                log_error(
-                    self.logger,
-                    "Aesthetic Assessment",
-                    "ValidationError",
-                    f"Validation failed for {image_path.name}: {error_msg}",
-                    "error"
-                )
+            self._validate_assessment(assessment, image_path)
 
             return assessment
 
@@ -379,10 +694,207 @@ Be specific and reference the actual visual elements you observe in the photogra
                 "notes": f"Assessment failed: {str(e)}"
             }
 
+    async def assess_batch_with_vlm(self, items: List[tuple[Path, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Assess several images with a single VLM request.
+
+        Falls back to one request per image if the batch call fails or its
+        response cannot be mapped back to the images.
+
+        Args:
+            items: List of (image_path, metadata) tuples
+
+        Returns:
+            Aesthetic assessment dictionaries, aligned with items
+        """
+        if len(items) == 1:
+            return [await self.assess_with_vlm(*items[0])]
+
+        image_ids = [metadata.get('image_id', path.stem) for path, metadata in items]
+
+        try:
+            assessments = await self._call_vlm_api_batch([path for path, _ in items], image_ids)
+        except Exception as e:
+            log_warning(
+                self.logger,
+                "Batch assessment of %d images failed, retrying per image: %s",
+                "Aesthetic Assessment",
+                len(items),
+                e
+            )
+            return list(await asyncio.gather(
+                *(self.assess_with_vlm(path, metadata) for path, metadata in items)
+            ))
+
+        for (path, _), image_id, assessment in zip(items, image_ids, assessments):
+            assessment['image_id'] = image_id
+            self._validate_assessment(assessment, path)
+
+        return assessments
+
+    def assess_locally(
+        self,
+        items: List[tuple[Path, Dict[str, Any]]],
+        issues: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Assess images with the local CLIP scorer instead of Gemini.
+
+        The predictor yields a single score, so every dimension gets the same
+        rating. Images that cannot be read get neutral default ratings.
+        Blocking GPU/CPU work; run via asyncio.to_thread.
+
+        Args:
+            items: List of (image_path, metadata) tuples
+            issues: Optional list that collects a message per unreadable image
+
+        Returns:
+            Aesthetic assessment dictionaries, aligned with items
+        """
+        scores = self.local_scorer.score([path for path, _ in items])
+
+        assessments = []
+        for (path, metadata), score in zip(items, scores):
+            if score is None:
+                error_msg = f"Failed to read {path.name} for local scoring"
+                log_error(self.logger, "Aesthetic Assessment", "ProcessingError", error_msg, "error")
+                if issues is not None:
+                    issues.append(error_msg)
+                assessments.append({
+                    "image_id": metadata.get('image_id', path.stem),
+                    "composition": 3,
+                    "framing": 3,
+                    "lighting": 3,
+                    "subject_interest": 3,
+                    "overall_aesthetic": 3,
+                    "notes": "Assessment failed: image could not be read"
+                })
+                continue
+
+            rating = score_to_rating(score)
+            assessment = {
+                "image_id": metadata.get('image_id', path.stem),
+                "composition": rating,
+                "framing": rating,
+                "lighting": rating,
+                "subject_interest": rating,
+                "overall_aesthetic": rating,
+                "notes": f"Local CLIP aesthetic score: {score:.2f}/10"
+            }
+            self._validate_assessment(assessment, path)
+            assessments.append(assessment)
+
+        return assessments
+
+    async def _pre_encode_all(self, image_paths: List[Path]):
+        """
+        Resize every image into the resize cache before any API call is made.
+
+        Decoding then happens up front on worker threads (Pillow releases the
+        GIL), and requests holding a semaphore slot only read cached bytes.
+
+        Args:
+            image_paths: Paths to images that will be sent to the API
+        """
+        results = await asyncio.gather(
+            *(asyncio.to_thread(
+                self.resize_cache.get_or_resize,
+                path,
+                max_dimension=self.max_dimension,
+                quality=self.jpeg_quality,
+                image_format=self.upload_format
+            ) for path in image_paths),
+            return_exceptions=True
+        )
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        if failed:
+            log_warning(self.logger, "Failed to pre-resize %d images; they will be retried per request", "Aesthetic Assessment", failed)
+
+    def _perceptual_hash(self, image_path: Path) -> int:
+        """Compute a 64-bit pHash as an int, decoding JPEGs at reduced scale."""
+        stat = image_path.stat()
+        cache_key = hashlib.sha1(
+            f"{image_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}".encode('utf-8')
+        ).hexdigest()
+        cached = self.hash_cache.get(cache_key)
+        if cached is not None:
+            return cached['phash']
+
+        with Image.open(image_path) as img:
+            img.draft('L', (128, 128))
+            image_hash = int(str(imagehash.phash(img)), 16)
+
+        self.hash_cache.set(cache_key, {'phash': image_hash})
+        return image_hash
+
+    async def _find_near_duplicates(self, items: List[tuple[Path, Dict[str, Any]]]) -> Dict[int, int]:
+        """
+        Find near-duplicate images (e.g. burst shots) by perceptual hash.
+
+        Args:
+            items: List of (image_path, metadata) tuples
+
+        Returns:
+            Mapping of duplicate item index to the index of the earlier image it matches
+        """
+        hashes = await asyncio.gather(
+            *(asyncio.to_thread(self._perceptual_hash, path) for path, _ in items),
+            return_exceptions=True
+        )
+
+        # Compare each image against all earlier representatives in one vectorized pass
+        representative_hashes = np.empty(len(hashes), dtype=np.uint64)
+        representative_indices = []
+        duplicate_of = {}
+        for index, image_hash in enumerate(hashes):
+            if isinstance(image_hash, Exception):
+                continue
+            count = len(representative_indices)
+            if count:
+                distances = _popcount64(representative_hashes[:count] ^ np.uint64(image_hash))
+                matches = np.flatnonzero(distances <= self.fuzzy_dedup_max_distance)
+                if matches.size:
+                    duplicate_of[index] = representative_indices[matches[0]]
+                    continue
+            representative_hashes[count] = image_hash
+            representative_indices.append(index)
+
+        return duplicate_of
+
+    def _build_batch_prompt(self, count: int) -> str:
+        """Build the prompt for assessing several labelled images in one request."""
+        return f"""{self.SYSTEM_PROMPT}
+
+You will receive {count} images, each preceded by its label (Image 1 to Image {count}).
+Respond with a JSON array of exactly {count} objects, in image order:
+[
+    {{
+        "composition": <1-5>,
+        "framing": <1-5>,
+        "lighting": <1-5>,
+        "subject_interest": <1-5>,
+        "notes": "<brief analysis>"
+    }}
+]"""
+
+    def _validate_assessment(self, assessment: Dict[str, Any], image_path: Path):
+        """Validate an assessment against the agent schema, logging failures."""
+        is_valid, error_msg = validate_agent_output("aesthetic_assessment", assessment)
+        if not is_valid:
+            log_error(
+                self.logger,
+                "Aesthetic Assessment",
+                "ValidationError",
+                f"Validation failed for {image_path.name}: {error_msg}",
+                "error"
+            )
+
     def run(self, image_paths: List[Path], metadata_list: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Run aesthetic assessment on all images.
 
+        Synchronous wrapper around run_async() for existing callers.
+
         Args:
             image_paths: List of image file paths
             metadata_list: List of metadata from Agent 1
@@ -390,68 +902,130 @@ Be specific and reference the actual visual elements you observe in the photogra
         Returns:
             Tuple of (assessment_list, validation_summary)
         """
-        log_info(self.logger, f"Starting aesthetic assessment for {len(image_paths)} images", "Aesthetic Assessment")
+        return run_coroutine_sync(self.run_async(image_paths, metadata_list))
 
-        # Create lookup for metadata
-        metadata_map = {m['image_id']: m for m in metadata_list}
+    async def run_async(self, image_paths: List[Path], metadata_list: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run aesthetic assessment on all images concurrently.
+
+        Args:
+            image_paths: List of image file paths
+            metadata_list: List of metadata from Agent 1
+
+        Returns:
+            Tuple of (assessment_list, validation_summary)
+        """
+        log_info(self.logger, "Starting aesthetic assessment for %d images", "Aesthetic Assessment", len(image_paths))
+
+        # Create lookup for metadata (entries without an image_id are ignored)
+        metadata_map = {m.get('image_id'): m for m in metadata_list}
 
         assessment_list = []
         issues = []
 
-        # Process images in parallel (with rate limiting for API calls)
-        batch_size = self.agent_config.get('batch_size', 5)
-
-        for i in range(0, len(image_paths), batch_size):
-            batch_paths = image_paths[i:i + batch_size]
-
-            with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
-                futures = []
-                for path in batch_paths:
-                    image_id = path.stem
-                    metadata = metadata_map.get(image_id, {'image_id': image_id})
-                    futures.append(executor.submit(self.assess_with_vlm, path, metadata))
-
-                for future in as_completed(futures):
-                    try:
-                        assessment = future.result()
-                        assessment_list.append(assessment)
-
-                    except Exception as e:
-                        error_msg = f"Failed to assess image: {str(e)}"
-                        issues.append(error_msg)
-                        log_error(
-                            self.logger,
-                            "Aesthetic Assessment",
-                            "ExecutionError",
-                            error_msg,
-                            "error"
-                        )
+        # Group images per request; batching needs the metadata-free concise prompt
+        batch_size = self.vlm_batch_size if self.use_concise_prompts else 1
+        items = []
+        for path in image_paths:
+            try:
+                metadata = metadata_map[path.stem]
+            except KeyError:
+                metadata = {'image_id': path.stem}
+            items.append((path, metadata))
+
+        # Assess one image per group of near-duplicates and copy its scores
+        duplicate_of = await self._find_near_duplicates(items) if self.fuzzy_dedup_enabled else {}
+        if duplicate_of:
+            log_info(self.logger, "Skipping %d near-duplicate images", "Aesthetic Assessment", len(duplicate_of))
+        unique_items = [item for index, item in enumerate(items) if index not in duplicate_of]
+        groups = [unique_items[i:i + batch_size] for i in range(0, len(unique_items), batch_size)]
+
+        # Take image decoding off the rate-limited request path
+        if self.enable_resizing and self.resize_cache.enabled and not self.local_scorer:
+            await self._pre_encode_all([path for path, _ in unique_items])
+
+        # Process all groups concurrently, bounding in-flight API calls
+        semaphore = asyncio.Semaphore(self.parallel_workers)
+
+        async def assess_bounded(group: List[tuple[Path, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.assess_batch_with_vlm(group)
+
+        if self.local_scorer:
+            results = await asyncio.gather(asyncio.to_thread(self.assess_locally, unique_items, issues), return_exceptions=True)
+        else:
+            results = await asyncio.gather(
+                *(assess_bounded(group) for group in groups),
+                return_exceptions=True
+            )
+
+        for result in results:
+            if isinstance(result, Exception):
+                error_msg = f"Failed to assess image: {str(result)}"
+                issues.append(error_msg)
+                log_error(
+                    self.logger,
+                    "Aesthetic Assessment",
+                    "ExecutionError",
+                    error_msg,
+                    "error"
+                )
+            else:
+                assessment_list.extend(result)
+
+        if duplicate_of:
+            assessments_by_id = {a['image_id']: a for a in assessment_list}
+            for index, representative_index in duplicate_of.items():
+                representative = assessments_by_id.get(items[representative_index][1]['image_id'])
+                if representative:
+                    duplicate = {k: v for k, v in representative.items() if k != 'token_usage'}
+                    duplicate['image_id'] = items[index][1]['image_id']
+                    duplicate['duplicate_of'] = representative['image_id']
+                    assessments_by_id[duplicate['image_id']] = duplicate
+            assessment_list = [
+                assessments_by_id[metadata['image_id']]
+                for _, metadata in items if metadata['image_id'] in assessments_by_id
+            ]
 
         # Calculate statistics
         if assessment_list:
-            avg_aesthetic = sum(a['overall_aesthetic'] for a in assessment_list) / len(assessment_list)
+            scores = np.array(
+                [[a['composition'], a['framing'], a['lighting'], a['subject_interest'], a['overall_aesthetic']]
+                 for a in assessment_list],
+                dtype=np.int8
+            )
+            dimension_averages = scores.mean(axis=0)
+            avg_aesthetic = float(dimension_averages[4])
+
+            prefiltered_count = sum(1 for a in assessment_list if a.get('prefiltered'))
+            if prefiltered_count:
+                log_info(self.logger, "Pre-filter skipped the API for %d images", "Aesthetic Assessment", prefiltered_count)
 
             # Get token usage summary
             usage_summary = self.token_tracker.get_summary()
 
             summary = f"Assessed {len(assessment_list)} images, average aesthetic: {avg_aesthetic:.2f}/5"
+            log_info(self.logger, "Aesthetic assessment completed: %s", "Aesthetic Assessment", summary)
             log_info(
                 self.logger,
-                f"Aesthetic assessment completed: {summary}",
-                "Aesthetic Assessment"
+                "Dimension averages: composition %.2f, framing %.2f, lighting %.2f, subject_interest %.2f",
+                "Aesthetic Assessment",
+                *dimension_averages[:4]
             )
             log_info(
                 self.logger,
-                f"Total tokens used: {usage_summary['total_tokens']['total_tokens']:,} "
-                f"(input: {usage_summary['total_tokens']['prompt_tokens']:,}, "
-                f"output: {usage_summary['total_tokens']['completion_tokens']:,})",
-                "Aesthetic Assessment"
+                "Total tokens used: %d (input: %d, output: %d)",
+                "Aesthetic Assessment",
+                usage_summary['total_tokens']['total_tokens'],
+                usage_summary['total_tokens']['prompt_tokens'],
+                usage_summary['total_tokens']['completion_tokens']
             )
             log_info(
                 self.logger,
-                f"Estimated cost: ${usage_summary['estimated_cost_usd']:.4f} "
-                f"(avg: ${usage_summary['estimated_cost_usd']/len(assessment_list):.4f} per image)",
-                "Aesthetic Assessment"
+                "Estimated cost: $%.4f (avg: $%.4f per image)",
+                "Aesthetic Assessment",
+                usage_summary['estimated_cost_usd'],
+                usage_summary['estimated_cost_usd'] / len(assessment_list)
             )
 
             # Check if cost exceeds threshold
@@ -460,8 +1034,10 @@ Be specific and reference the actual visual elements you observe in the photogra
             if usage_summary['estimated_cost_usd'] > threshold:
                 log_warning(
                     self.logger,
-                    f"Cost ${usage_summary['estimated_cost_usd']:.4f} exceeds threshold ${threshold:.2f}",
-                    "Aesthetic Assessment"
+                    "Cost $%.4f exceeds threshold $%.2f",
+                    "Aesthetic Assessment",
+                    usage_summary['estimated_cost_usd'],
+                    threshold
                 )
         else:
             summary = "No images were successfully assessed"
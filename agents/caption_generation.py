@@ -1,20 +1,40 @@
 """Agent 6: Caption Generation - Generate multi-level captions for images."""
 
+import asyncio
+import copy
 import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List
-import base64
-import json
+from typing import Any, Dict, List, Optional
 import re
 
-from google import genai
 from google.genai import types
 
+from utils.genai_client import get_async_genai_client, get_genai_client
+from utils.helpers import find_json, run_coroutine_sync
 from utils.logger import log_error, log_info, log_warning
 from utils.validation import validate_agent_output, create_validation_summary
-from utils.heic_reader import is_heic_file, open_heic_with_pil
-from utils.token_tracker import TokenTracker, resize_image_for_api, get_optimized_media_type
+from utils.resize_cache import ResizedImageCache
+from utils.response_cache import ResponseCache
+from utils.token_tracker import TokenTracker, get_optimized_media_type, get_upload_media_type
+
+# Shared read-only default for images missing from an upstream agent's output
+_EMPTY: Dict[str, Any] = {}
+
+# Structured-output schema so Gemini returns exactly the caption fields
+_CAPTION_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "concise": types.Schema(type=types.Type.STRING),
+        "standard": types.Schema(type=types.Type.STRING),
+        "detailed": types.Schema(type=types.Type.STRING),
+        "keywords": types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING))
+    },
+    required=["concise", "standard", "detailed", "keywords"],
+    property_ordering=["concise", "standard", "detailed", "keywords"]
+)
 
 
 class CaptionGenerationAgent:
@@ -33,6 +53,8 @@ class CaptionGenerationAgent:
     Incorporate location, time, technical details, and cultural context.
     """
 
+    _WORD_RE = re.compile(r'\b\w+\b')
+
     # Concise system prompt (optimized for token reduction)
     SYSTEM_PROMPT_CONCISE = """Generate travel photo captions.
 Return 3 levels: concise (<100 chars), standard (150-250 chars), detailed (300-500 chars).
@@ -83,6 +105,10 @@ Add keywords. Respond with ONLY valid JSON."""
         self.config = config
         self.logger = logger
         self.agent_config = config.get('agents', {}).get('caption_generation', {})
+        self.parallel_workers = self.agent_config.get('parallel_workers', 4)
+        self.vlm_batch_size = max(1, self.agent_config.get('vlm_batch_size', 1))
+        self.min_quality_for_caption = self.agent_config.get('min_quality_for_caption', 0)
+        self.stream_responses = self.agent_config.get('stream_responses', False)
 
         # Configure Gemini API
         self.api_config = config.get('api', {}).get('google', {})
@@ -91,12 +117,15 @@ Add keywords. Respond with ONLY valid JSON."""
             log_warning(self.logger, "Google API model not specified in config, defaulting to 'gemini-1.5-flash'", "Caption Generation")
             self.model_name = "gemini-1.5-flash"
 
+        # Optional stronger model for images that scored well upstream
+        self.pro_model_name = self.api_config.get('pro_model')
+        self.pro_model_min_score = self.agent_config.get('pro_model_min_score', 4)
+
         # Initialize Vertex AI client
         try:
-            self.client = genai.Client(
-                vertexai=True,
-                project=self.api_config.get('project'),
-                location=self.api_config.get('location', 'us-central1')
+            self.client = get_genai_client(
+                self.api_config.get('project'),
+                self.api_config.get('location', 'us-central1')
             )
             log_info(self.logger, f"Initialized Vertex AI client for project {self.api_config.get('project')}", "Caption Generation")
         except Exception as e:
@@ -107,6 +136,7 @@ Add keywords. Respond with ONLY valid JSON."""
         pricing_config = self.api_config.get('pricing', {})
         pricing = {
             'input_per_1k': pricing_config.get('input_per_1k_tokens', 0.000075),
+            'cached_input_per_1k': pricing_config.get('cached_input_per_1k_tokens', 0.00001875),
             'output_per_1k': pricing_config.get('output_per_1k_tokens', 0.0003)
         }
         self.token_tracker = TokenTracker(pricing=pricing)
@@ -116,12 +146,221 @@ Add keywords. Respond with ONLY valid JSON."""
         self.enable_resizing = self.optimization.get('enable_image_resizing', True)
         self.max_dimension = self.optimization.get('max_image_dimension', 1024)
         self.jpeg_quality = self.optimization.get('jpeg_quality', 85)
+        self.upload_format = 'WEBP' if self.optimization.get('use_webp', False) else 'JPEG'
         self.use_concise_prompts = self.optimization.get('use_concise_prompts', True)
 
+        # Share resized uploads with the other agents and across runs
+        performance_config = config.get('performance', {})
+        self.resize_cache = ResizedImageCache(
+            performance_config.get('cache_dir', './cache'),
+            enabled=performance_config.get('cache_resized_images', True),
+            max_size_mb=performance_config.get('resize_cache_max_mb', 500)
+        )
+
+        # Reuse earlier captions for unchanged images and prompts
+        self.response_cache = ResponseCache(
+            performance_config.get('cache_dir', './cache'),
+            'caption_generation',
+            logger=self.logger,
+            enabled=performance_config.get('cache_vlm_responses', True)
+        )
+
         # Select prompt based on optimization setting
         self.SYSTEM_PROMPT = self.SYSTEM_PROMPT_CONCISE if self.use_concise_prompts else self.SYSTEM_PROMPT_FULL
+        self._build_prompt_templates()
+
+        # Structured output: bare JSON of the caption shape, no surrounding prose
+        self._generation_config = types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=_CAPTION_SCHEMA
+        )
+        self._batch_generation_config = types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=types.Schema(type=types.Type.ARRAY, items=_CAPTION_SCHEMA)
+        )
+
+        # Optionally send the system prompt once as Gemini cached content
+        self.cache_system_prompt = self.agent_config.get('cache_system_prompt', False)
+        self.system_prompt_cache_ttl = self.agent_config.get('system_prompt_cache_ttl_seconds', 3600)
+        self._system_prompt_cache_name = None
+        self._system_prompt_cache_expiry = 0.0
+        self._system_prompt_cache_lock = threading.Lock()
+
+        # Requests in progress by response cache key, so identical images share one call
+        self._inflight_requests: Dict[str, asyncio.Task] = {}
+
+    def _get_system_prompt_cache(self) -> Optional[str]:
+        """
+        Return the cached-content name holding the system prompt, creating it if needed.
+
+        Blocking API call; run via asyncio.to_thread from async code. Disables
+        caching for this agent if creation fails (e.g. the prompt is below the
+        model's minimum cacheable size).
+
+        Returns:
+            Cached content resource name, or None to send the prompt inline
+        """
+        with self._system_prompt_cache_lock:
+            if not self.cache_system_prompt or not self.client:
+                return None
+
+            if self._system_prompt_cache_name and time.monotonic() < self._system_prompt_cache_expiry:
+                return self._system_prompt_cache_name
+
+            try:
+                cache = self.client.caches.create(
+                    model=self.model_name,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=self.SYSTEM_PROMPT,
+                        ttl=f"{self.system_prompt_cache_ttl}s"
+                    )
+                )
+            except Exception as e:
+                log_warning(self.logger, f"Failed to cache system prompt, sending it inline: {e}", "Caption Generation")
+                self.cache_system_prompt = False
+                self._system_prompt_cache_name = None
+                return None
+
+            self._system_prompt_cache_name = cache.name
+            # Refresh a minute early so in-flight requests never reference an expired cache
+            self._system_prompt_cache_expiry = time.monotonic() + self.system_prompt_cache_ttl - 60
+            log_info(self.logger, "Cached caption system prompt as %s", "Caption Generation", cache.name)
+            return cache.name
+
+    def _select_model(self, quality: Dict[str, Any], aesthetic: Dict[str, Any]) -> str:
+        """
+        Pick the Gemini model for an image.
+
+        Images that scored at least pro_model_min_score for both technical
+        quality and aesthetics go to the configured pro model, if any; all
+        others use the default model.
+
+        Args:
+            quality: Quality assessment
+            aesthetic: Aesthetic assessment
+
+        Returns:
+            Model name
+        """
+        if (
+            self.pro_model_name
+            and quality.get('quality_score', 3) >= self.pro_model_min_score
+            and aesthetic.get('overall_aesthetic', 3) >= self.pro_model_min_score
+        ):
+            return self.pro_model_name
+        return self.model_name
+
+    async def _with_system_prompt(
+        self,
+        prompt: str,
+        model_name: str,
+        generation_config: types.GenerateContentConfig
+    ) -> tuple[str, types.GenerateContentConfig]:
+        """
+        Attach the system prompt to a request, by cache reference or inline.
+
+        Args:
+            prompt: Request-specific prompt text
+            model_name: Model the request goes to; cached content only serves the default model
+            generation_config: Base generation config for the request
 
-    def _call_llm_api(
+        Returns:
+            Tuple of (prompt_text, generation_config)
+        """
+        cache_name = None
+        if self.cache_system_prompt and model_name == self.model_name:
+            cache_name = await asyncio.to_thread(self._get_system_prompt_cache)
+        if cache_name:
+            return prompt, generation_config.model_copy(update={'cached_content': cache_name})
+        return f"{self.SYSTEM_PROMPT}\n\n{prompt}", generation_config
+
+    async def _generate(
+        self,
+        model_name: str,
+        contents: List[types.Part],
+        generation_config: types.GenerateContentConfig,
+        opener: str = '{'
+    ) -> tuple[str, Any]:
+        """
+        Send a caption request and return its text and usage metadata.
+
+        With stream_responses enabled the response is streamed and the stream
+        is closed as soon as the text holds a complete JSON value starting
+        with opener, so trailing commentary is never waited for.
+
+        Args:
+            model_name: Gemini model to call
+            contents: Request parts
+            generation_config: Generation config
+            opener: '{' for an object response, '[' for an array
+
+        Returns:
+            Tuple of (response_text, usage_metadata or None)
+        """
+        client = get_async_genai_client(
+            self.api_config.get('project'),
+            self.api_config.get('location', 'us-central1')
+        )
+        if not self.stream_responses:
+            response = await client.models.generate_content(
+                model=model_name,
+                contents=contents,
+                config=generation_config
+            )
+            return response.text, getattr(response, 'usage_metadata', None)
+
+        closer = '}' if opener == '{' else ']'
+        chunks = []
+        usage_metadata = None
+        stream = await client.models.generate_content_stream(
+            model=model_name,
+            contents=contents,
+            config=generation_config
+        )
+        try:
+            async for chunk in stream:
+                # Usage counts are cumulative; keep the latest seen
+                usage_metadata = chunk.usage_metadata or usage_metadata
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    if closer in chunk.text and find_json(''.join(chunks), opener, first_only=True) is not None:
+                        break
+        finally:
+            await stream.aclose()
+
+        return ''.join(chunks), usage_metadata
+
+    def _load_image_bytes(self, image_path: Path) -> tuple[bytes, str]:
+        """
+        Read (and optionally resize) an image for upload.
+
+        Blocking disk and PIL work; run via asyncio.to_thread from async code.
+
+        Args:
+            image_path: Path to image
+
+        Returns:
+            Tuple of (image_bytes, media_type)
+        """
+        # Use optimized image resizing if enabled
+        if self.enable_resizing:
+            try:
+                image_bytes = self.resize_cache.get_or_resize(
+                    image_path,
+                    max_dimension=self.max_dimension,
+                    quality=self.jpeg_quality,
+                    image_format=self.upload_format
+                )
+                return image_bytes, get_upload_media_type(self.upload_format)
+            except Exception as e:
+                log_warning(self.logger, f"Failed to resize image, using original: {e}", "Caption Generation")
+
+        # Read original image (or fall back to it)
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        return image_bytes, get_optimized_media_type(image_path)
+
+    async def _call_llm_api(
         self,
         image_path: Path,
         metadata: Dict[str, Any],
@@ -145,127 +384,335 @@ Add keywords. Respond with ONLY valid JSON."""
             Captions dictionary
         """
         try:
-            # Use optimized image resizing if enabled
-            if self.enable_resizing:
-                try:
-                    image_bytes = resize_image_for_api(
-                        image_path,
-                        max_dimension=self.max_dimension,
-                        quality=self.jpeg_quality
-                    )
-                    media_type = get_optimized_media_type(image_path)
-                except Exception as e:
-                    log_warning(self.logger, f"Failed to resize image, using original: {e}", "Caption Generation")
-                    with open(image_path, 'rb') as f:
-                        image_bytes = f.read()
-                    media_type = get_optimized_media_type(image_path)
-            else:
-                with open(image_path, 'rb') as f:
-                    image_bytes = f.read()
-                media_type = get_optimized_media_type(image_path)
+            image_bytes, media_type = await asyncio.to_thread(self._load_image_bytes, image_path)
+
+            prompt = self._build_prompt(metadata, quality, aesthetic, category)
+            model_name = self._select_model(quality, aesthetic)
+
+            cache_key = ResponseCache.make_key(image_bytes, model_name, self.SYSTEM_PROMPT, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                log_info(self.logger, "Using cached captions for %s", "Caption Generation", image_path.name)
+                return cached
+
+            # An identical image and prompt is already being captioned: share its reply
+            loop = asyncio.get_running_loop()
+            inflight = self._inflight_requests.get(cache_key)
+            if inflight is not None and inflight.get_loop() is loop:
+                log_info(self.logger, "Reusing in-flight captions for %s", "Caption Generation", image_path.name)
+                # Own copy: results for different images must not share nested dicts
+                captions = copy.deepcopy(await asyncio.shield(inflight))
+                captions.pop('token_usage', None)  # Billed to the image that made the request
+                return captions
+
+            task = loop.create_task(self._request_captions(
+                image_path, image_bytes, media_type, prompt, model_name, cache_key, image_id
+            ))
+            self._inflight_requests[cache_key] = task
+            try:
+                return await task
+            finally:
+                if self._inflight_requests.get(cache_key) is task:
+                    del self._inflight_requests[cache_key]
 
-            # Build context for captions
-            location = category.get('location', 'the location')
-            time_cat = category.get('time_category', 'daytime')
-            main_cat = category.get('category', 'a scene')
-            subcats = ', '.join(category.get('subcategories', ['visual elements']))
+        except Exception as e:
+            log_error(
+                self.logger,
+                "Caption Generation",
+                "APIError",
+                f"Gemini API call failed for {image_path.name}: {str(e)}",
+                "error"
+            )
+            # Return default captions on API failure
+            return {
+                'captions': {
+                    'concise': 'Travel photograph',
+                    'standard': 'A beautiful travel photograph capturing a memorable moment.',
+                    'detailed': 'This travel photograph documents a moment from a journey, '
+                               'preserving the essence of exploration and discovery.'
+                },
+                'keywords': ['travel', 'photography', 'journey']
+            }
 
-            # Create prompt for caption generation (concise or detailed)
-            if self.use_concise_prompts:
-                # Optimized concise prompt
-                prompt = f"""{self.SYSTEM_PROMPT}
+    async def _request_captions(
+        self,
+        image_path: Path,
+        image_bytes: bytes,
+        media_type: str,
+        prompt: str,
+        model_name: str,
+        cache_key: str,
+        image_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Send one caption request to Gemini and cache the parsed reply.
 
-Category: {main_cat}, Time: {time_cat}.
+        Errors are raised; _call_llm_api turns them into default captions.
 
-{{
-    "concise": "<max 100 chars>",
-    "standard": "<150-250 chars>",
-    "detailed": "<300-500 chars>",
-    "keywords": ["<kw1>", "<kw2>"]
-}}"""
-            else:
-                # Full detailed prompt
-                prompt = f"""{self.SYSTEM_PROMPT}
+        Args:
+            image_path: Path to image, for logging
+            image_bytes: Image bytes to upload
+            media_type: MIME type of image_bytes
+            prompt: Caption prompt (without the system prompt)
+            model_name: Gemini model to use
+            cache_key: Response cache key for this image and prompt
+            image_id: Image identifier for token tracking
+
+        Returns:
+            Captions dictionary
+        """
+        # Call Gemini API with image via Vertex AI
+        if not self.client:
+            raise Exception("Vertex AI client not initialized")
+
+        # Reference the cached system prompt, or send it inline
+        prompt, generation_config = await self._with_system_prompt(prompt, model_name, self._generation_config)
+
+        response_text, usage_metadata = await self._generate(
+            model_name,
+            [
+                types.Part.from_text(text=prompt),
+                types.Part.from_bytes(
+                    data=image_bytes,
+                    mime_type=media_type
+                )
+            ],
+            generation_config
+        )
+
+        # Parse response
+        log_info(self.logger, f"Received Gemini captions for {image_path.name}", "Caption Generation")
+
+        # Extract captions; only well-formed JSON responses are cached
+        response_json = find_json(response_text)
+        if isinstance(response_json, dict):
+            captions = self._build_captions(response_json)
+            self.response_cache.set(cache_key, captions)
+        else:
+            captions = self._parse_caption_response(response_text)
+
+        # Track token usage and calculate cost
+        if usage_metadata is not None:
+            usage_record = self.token_tracker.track_usage(usage_metadata, image_id)
+            captions['token_usage'] = usage_record
 
-CONTEXT:
+            # Log per-image cost if enabled
+            cost_config = self.config.get('cost_tracking', {})
+            if cost_config.get('log_per_image', True):
+                log_info(
+                    self.logger,
+                    f"Token cost for {image_path.name}: ${usage_record['estimated_cost_usd']:.4f} "
+                    f"({usage_record['total_token_count']} tokens)",
+                    "Caption Generation"
+                )
+
+        return captions
+
+    def _build_prompt(
+        self,
+        metadata: Dict[str, Any],
+        quality: Dict[str, Any],
+        aesthetic: Dict[str, Any],
+        category: Dict[str, Any]
+    ) -> str:
+        """
+        Build the single-image caption prompt (without the system prompt).
+
+        Only the context block varies per image; the response format comes
+        from the templates built in _build_prompt_templates().
+
+        Args:
+            metadata: Image metadata
+            quality: Quality assessment
+            aesthetic: Aesthetic assessment
+            category: Categorization
+
+        Returns:
+            Prompt text
+        """
+        time_cat = category.get('time_category', 'daytime')
+        main_cat = category.get('category', 'a scene')
+
+        # Create prompt for caption generation (concise or detailed)
+        if self.use_concise_prompts:
+            return f"Category: {main_cat}, Time: {time_cat}." + self._prompt_concise_suffix
+
+        camera_settings = metadata.get('camera_settings', {})
+        context_block = f"""CONTEXT:
 - Image category: {main_cat}
-- Key elements: {subcats}
+- Key elements: {', '.join(category.get('subcategories', ['visual elements']))}
 - Time of day: {time_cat}
-- Location: {location}
+- Location: {category.get('location', 'the location')}
 - Technical quality score: {quality.get('quality_score', 3)}/5
 - Aesthetic score: {aesthetic.get('overall_aesthetic', 3)}/5
-- Camera: {metadata.get('camera_settings', {}).get('camera_model', 'Professional camera')}
-- Aperture: {metadata.get('camera_settings', {}).get('aperture', 'unknown')}
-- ISO: {metadata.get('camera_settings', {}).get('iso', 'unknown')}
+- Camera: {camera_settings.get('camera_model', 'Professional camera')}
+- Aperture: {camera_settings.get('aperture', 'unknown')}
+- ISO: {camera_settings.get('iso', 'unknown')}"""
+        return context_block + self._prompt_full_suffix
+
+    def _build_prompt_templates(self):
+        """Build the invariant response-format text once so only context is formatted per image."""
+        # Optimized concise prompt
+        self._prompt_concise_suffix = """
+
+{
+    "concise": "<max 100 chars>",
+    "standard": "<150-250 chars>",
+    "detailed": "<300-500 chars>",
+    "keywords": ["<kw1>", "<kw2>"]
+}"""
+
+        # Full detailed prompt, following the per-image context block
+        self._prompt_full_suffix = """
 
 RESPONSE FORMAT: Generate three levels of captions as a JSON object:
-{{
+{
     "concise": "<1 line, max 100 chars, punchy Twitter-style>",
     "standard": "<2-3 lines, 150-250 chars, Instagram-style narrative>",
     "detailed": "<paragraph style, 300-500 chars, editorial depth>",
     "keywords": ["<keyword1>", "<keyword2>", ...]
-}}
+}
 
 Make captions specific, avoid clichés, and incorporate the actual visual elements."""
 
-            # Call Gemini API with image via Vertex AI
-            if not self.client:
-                raise Exception("Vertex AI client not initialized")
-
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
-                    types.Part.from_text(text=prompt),
-                    types.Part.from_bytes(
-                        data=image_bytes,
-                        mime_type=media_type
-                    )
-                ]
-            )
-
-            # Parse response
-            response_text = response.text
-            log_info(self.logger, f"Received Gemini captions for {image_path.name}", "Caption Generation")
+    async def _call_llm_api_batch(
+        self,
+        image_paths: List[Path],
+        categories: List[Dict[str, Any]],
+        image_ids: List[str],
+        model_name: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Call Gemini API once to caption several images.
 
-            # Extract captions
-            captions = self._parse_caption_response(response_text)
+        Unlike _call_llm_api, failures are raised so the caller can fall back
+        to per-image requests. Images with cached captions are not sent.
 
-            # Track token usage and calculate cost
-            if hasattr(response, 'usage_metadata'):
-                usage_record = self.token_tracker.track_usage(response.usage_metadata, image_id)
-                captions['token_usage'] = usage_record
-
-                # Log per-image cost if enabled
-                cost_config = self.config.get('cost_tracking', {})
-                if cost_config.get('log_per_image', True):
-                    log_info(
-                        self.logger,
-                        f"Token cost for {image_path.name}: ${usage_record['estimated_cost_usd']:.4f} "
-                        f"({usage_record['total_token_count']} tokens)",
-                        "Caption Generation"
-                    )
+        Args:
+            image_paths: Paths to images
+            categories: Categorizations, aligned with image_paths
+            image_ids: Image identifiers for token tracking
+            model_name: Gemini model to use for the whole batch
 
-            return captions
+        Returns:
+            Captions dictionaries, aligned with image_paths
+        """
+        loaded = await asyncio.gather(
+            *(asyncio.to_thread(self._load_image_bytes, path) for path in image_paths)
+        )
 
-        except Exception as e:
-            log_error(
+        # Batched images share the single-image cache entries (concise prompt: category only)
+        cache_keys = [
+            ResponseCache.make_key(
+                image_bytes,
+                model_name,
+                self.SYSTEM_PROMPT,
+                self._build_prompt({}, {}, {}, category)
+            )
+            for (image_bytes, _), category in zip(loaded, categories)
+        ]
+        captions_list = [self.response_cache.get(key) for key in cache_keys]
+
+        # Send each distinct image once; duplicates copy the first one's captions
+        pending = []
+        duplicates = []
+        first_index_by_key: Dict[str, int] = {}
+        for index, captions in enumerate(captions_list):
+            if captions is None:
+                first_index = first_index_by_key.setdefault(cache_keys[index], index)
+                if first_index == index:
+                    pending.append(index)
+                else:
+                    duplicates.append((index, first_index))
+
+        cached_count = len(image_paths) - len(pending) - len(duplicates)
+        if cached_count:
+            log_info(
                 self.logger,
+                "Using cached captions for %d of %d images",
                 "Caption Generation",
-                "APIError",
-                f"Gemini API call failed for {image_path.name}: {str(e)}",
-                "error"
+                cached_count,
+                len(image_paths)
             )
-            # Return default captions on API failure
-            return {
-                'captions': {
-                    'concise': 'Travel photograph',
-                    'standard': 'A beautiful travel photograph capturing a memorable moment.',
-                    'detailed': 'This travel photograph documents a moment from a journey, '
-                               'preserving the essence of exploration and discovery.'
-                },
-                'keywords': ['travel', 'photography', 'journey']
+
+        if not pending:
+            return captions_list
+
+        if not self.client:
+            raise Exception("Vertex AI client not initialized")
+
+        prompt, generation_config = await self._with_system_prompt(
+            self._build_batch_prompt(len(pending)),
+            model_name,
+            self._batch_generation_config
+        )
+        contents = [types.Part.from_text(text=prompt)]
+        for label, index in enumerate(pending, start=1):
+            image_bytes, media_type = loaded[index]
+            category = categories[index]
+            contents.append(types.Part.from_text(
+                text=f"Image {label}: Category: {category.get('category', 'a scene')}, "
+                     f"Time: {category.get('time_category', 'daytime')}."
+            ))
+            contents.append(types.Part.from_bytes(data=image_bytes, mime_type=media_type))
+
+        response_text, usage_metadata = await self._generate(model_name, contents, generation_config, '[')
+        log_info(self.logger, "Received Gemini batch captions for %d images", "Caption Generation", len(pending))
+
+        response_items = find_json(response_text, '[')
+        if response_items is None:
+            raise ValueError("No JSON array found in batch response")
+
+        if (
+            not isinstance(response_items, list)
+            or len(response_items) != len(pending)
+            or not all(isinstance(item, dict) for item in response_items)
+        ):
+            raise ValueError(f"Expected {len(pending)} caption objects in batch response")
+
+        for index, item in zip(pending, response_items):
+            captions_list[index] = self._build_captions(item)
+            self.response_cache.set(cache_keys[index], captions_list[index])
+
+        # Track token usage, split evenly across the images actually sent
+        if usage_metadata is not None:
+            usage_records = self.token_tracker.track_batch_usage(
+                usage_metadata,
+                [image_ids[index] for index in pending]
+            )
+            for index, usage_record in zip(pending, usage_records):
+                captions_list[index]['token_usage'] = usage_record
+
+            cost_config = self.config.get('cost_tracking', {})
+            if cost_config.get('log_per_image', True):
+                log_info(
+                    self.logger,
+                    "Token cost for batch of %d images: $%.4f",
+                    "Caption Generation",
+                    len(pending),
+                    sum(record['estimated_cost_usd'] for record in usage_records)
+                )
+
+        for index, first_index in duplicates:
+            captions_list[index] = {
+                key: copy.deepcopy(value) for key, value in captions_list[first_index].items() if key != 'token_usage'
             }
 
+        return captions_list
+
+    def _build_batch_prompt(self, count: int) -> str:
+        """Build the prompt for captioning several labelled images in one request."""
+        return f"""You will receive {count} images, each preceded by its label and context (Image 1 to Image {count}).
+Respond with a JSON array of exactly {count} objects, in image order:
+[
+    {{
+        "concise": "<max 100 chars>",
+        "standard": "<150-250 chars>",
+        "detailed": "<300-500 chars>",
+        "keywords": ["<kw1>", "<kw2>"]
+    }}
+]"""
+
     def _parse_caption_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse Gemini API response to extract captions and keywords.
@@ -278,41 +725,12 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
         """
         try:
             # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                response_json = json.loads(json_match.group())
-            else:
-                # Fallback if no JSON found
+            response_json = find_json(response_text)
+            if not isinstance(response_json, dict):
+                # Fallback if no usable JSON found
                 response_json = self._extract_captions_from_text(response_text)
 
-            captions = {
-                'concise': response_json.get('concise', 'Travel photograph'),
-                'standard': response_json.get('standard', 'A travel photograph.'),
-                'detailed': response_json.get('detailed', 'A travel photograph.')
-            }
-
-            # Enforce length constraints
-            if len(captions['concise']) > 100:
-                captions['concise'] = captions['concise'][:97] + "..."
-
-            if len(captions['standard']) > 250:
-                captions['standard'] = captions['standard'][:247] + "..."
-
-            if len(captions['detailed']) > 500:
-                captions['detailed'] = captions['detailed'][:497] + "..."
-
-            # Ensure minimum lengths
-            if len(captions['detailed']) < 100:
-                captions['detailed'] = captions['detailed'] + " This photograph captures a unique travel moment."
-
-            keywords = response_json.get('keywords', ['travel', 'photography'])
-            if not isinstance(keywords, list):
-                keywords = ['travel', 'photography']
-
-            return {
-                'captions': captions,
-                'keywords': keywords[:10]  # Limit to 10 keywords
-            }
+            return self._build_captions(response_json)
 
         except Exception as e:
             log_warning(self.logger, f"Failed to parse caption response: {str(e)}", "Caption Generation")
@@ -326,6 +744,41 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
                 'keywords': ['travel', 'photography', 'journey']
             }
 
+    def _build_captions(self, response_json: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize a parsed caption object, enforcing length limits and defaults.
+
+        Args:
+            response_json: Parsed caption fields from Gemini
+
+        Returns:
+            Dictionary with captions and keywords
+        """
+        concise = response_json.get('concise') or 'Travel photograph'
+        standard = response_json.get('standard') or 'A travel photograph.'
+        detailed = response_json.get('detailed') or 'A travel photograph.'
+
+        # Enforce length constraints (strings already in range are kept as-is)
+        concise = self._clamp(concise, 100)
+        standard = self._clamp(standard, 250)
+        detailed = self._clamp(detailed, 500)
+
+        # Ensure minimum lengths
+        if len(detailed) < 100:
+            detailed += " This photograph captures a unique travel moment."
+
+        keywords = response_json.get('keywords')
+
+        return {
+            'captions': {'concise': concise, 'standard': standard, 'detailed': detailed},
+            'keywords': keywords[:10] if isinstance(keywords, list) else ['travel', 'photography']  # Limit to 10 keywords
+        }
+
+    @staticmethod
+    def _clamp(text: str, limit: int) -> str:
+        """Truncate text to limit characters with a trailing ellipsis, if needed."""
+        return text if len(text) <= limit else text[:limit - 3] + "..."
+
     def _extract_captions_from_text(self, text: str) -> Dict[str, Any]:
         """
         Extract captions from natural language response.
@@ -344,9 +797,11 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
 
         keywords = []
         # Try to extract keywords from common patterns
-        if 'keyword' in text.lower():
-            keyword_section = text.lower().split('keyword')[1]
-            words = re.findall(r'\b\w+\b', keyword_section)
+        lowered = text.lower()
+        keyword_start = lowered.find('keyword')
+        if keyword_start != -1:
+            keyword_section = lowered[keyword_start + len('keyword'):]
+            words = self._WORD_RE.findall(keyword_section)
             keywords = words[:10]
 
         if not keywords:
@@ -359,7 +814,7 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
             'keywords': keywords
         }
 
-    def process_image(
+    async def process_image(
         self,
         image_path: Path,
         metadata: Dict[str, Any],
@@ -384,7 +839,7 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
             image_id = metadata.get('image_id', image_path.stem)
 
             # Generate captions
-            caption_data = self._call_llm_api(
+            caption_data = await self._call_llm_api(
                 image_path,
                 metadata,
                 quality,
@@ -393,27 +848,7 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
                 image_id
             )
 
-            result = {
-                'image_id': image_id,
-                'captions': caption_data['captions'],
-                'keywords': caption_data['keywords']
-            }
-
-            if 'token_usage' in caption_data:
-                result['token_usage'] = caption_data['token_usage']
-
-            # Validate
-            is_valid, error_msg = validate_agent_output("caption_generation", result)
-            if not is_valid:
-                log_error(
-                    self.logger,
-                    "Caption Generation",
-                    "ValidationError",
-                    f"Validation failed for {image_path.name}: {error_msg}",
-                    "warning"
-                )
-
-            return result
+            return self._build_result(image_path, image_id, caption_data)
 
         except Exception as e:
             log_error(
@@ -423,19 +858,80 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
                 f"Failed to generate captions for {image_path.name}: {str(e)}",
                 "error"
             )
-            return {
-                'image_id': metadata.get('image_id', image_path.stem),
-                'captions': {
-                    'concise': 'Travel photograph',
-                    'standard': 'A travel photograph captured during a journey. ' * 2,
-                    'detailed': 'A travel photograph that preserves a moment from the journey. '
-                               'This image captures the essence of exploration and discovery, '
-                               'offering viewers a glimpse into a unique location and experience. '
-                               'The photograph serves as a visual memory of travel adventures and '
-                               'the beauty found in exploring new places and cultures around the world.'
-                },
-                'keywords': ['travel', 'photography', 'journey']
-            }
+            return self._default_result(metadata.get('image_id', image_path.stem))
+
+    def _default_result(self, image_id: str) -> Dict[str, Any]:
+        """Build templated captions for an image that is not sent to Gemini."""
+        return {
+            'image_id': image_id,
+            'captions': {
+                'concise': 'Travel photograph',
+                'standard': 'A travel photograph captured during a journey. ' * 2,
+                'detailed': 'A travel photograph that preserves a moment from the journey. '
+                           'This image captures the essence of exploration and discovery, '
+                           'offering viewers a glimpse into a unique location and experience. '
+                           'The photograph serves as a visual memory of travel adventures and '
+                           'the beauty found in exploring new places and cultures around the world.'
+            },
+            'keywords': ['travel', 'photography', 'journey']
+        }
+
+    async def process_batch(
+        self,
+        items: List[tuple[Path, Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate captions for several images with a single Gemini request.
+
+        All items must route to the same model (see _select_model).
+
+        Falls back to one request per image if the batch call fails or its
+        response cannot be mapped back to the images.
+
+        Args:
+            items: List of (image_path, metadata, quality, aesthetic, category) tuples
+
+        Returns:
+            Caption data, aligned with items
+        """
+        if len(items) == 1:
+            return [await self.process_image(*items[0])]
+
+        image_ids = [metadata.get('image_id', path.stem) for path, metadata, *_ in items]
+
+        try:
+            captions_list = await self._call_llm_api_batch(
+                [item[0] for item in items],
+                [item[4] for item in items],
+                image_ids,
+                # Groups are built per model, so the first item decides
+                self._select_model(items[0][2], items[0][3])
+            )
+        except Exception as e:
+            log_warning(
+                self.logger,
+                f"Batch captioning of {len(items)} images failed, retrying per image: {e}",
+                "Caption Generation"
+            )
+            return list(await asyncio.gather(*(self.process_image(*item) for item in items)))
+
+        return [
+            self._build_result(item[0], image_id, caption_data)
+            for item, image_id, caption_data in zip(items, image_ids, captions_list)
+        ]
+
+    def _build_result(self, image_path: Path, image_id: str, caption_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble the agent output for one image; run_async() validates it."""
+        result = {
+            'image_id': image_id,
+            'captions': caption_data['captions'],
+            'keywords': caption_data['keywords']
+        }
+
+        if 'token_usage' in caption_data:
+            result['token_usage'] = caption_data['token_usage']
+
+        return result
 
     def run(
         self,
@@ -448,6 +944,37 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
         """
         Generate captions for all images.
 
+        Synchronous wrapper around run_async() for existing callers.
+
+        Args:
+            image_paths: List of image paths
+            metadata_list: Metadata from Agent 1
+            quality_assessments: Quality from Agent 2
+            aesthetic_assessments: Aesthetic from Agent 3
+            categorizations: Categories from Agent 5
+
+        Returns:
+            Tuple of (captions_list, validation_summary)
+        """
+        return run_coroutine_sync(self.run_async(
+            image_paths,
+            metadata_list,
+            quality_assessments,
+            aesthetic_assessments,
+            categorizations
+        ))
+
+    async def run_async(
+        self,
+        image_paths: List[Path],
+        metadata_list: List[Dict[str, Any]],
+        quality_assessments: List[Dict[str, Any]],
+        aesthetic_assessments: List[Dict[str, Any]],
+        categorizations: List[Dict[str, Any]]
+    ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Generate captions for all images concurrently.
+
         Args:
             image_paths: List of image paths
             metadata_list: Metadata from Agent 1
@@ -460,29 +987,63 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
         """
         log_info(self.logger, f"Starting caption generation for {len(image_paths)} images", "Caption Generation")
 
-        # Create lookups
-        metadata_map = {m['image_id']: m for m in metadata_list}
-        quality_map = {q['image_id']: q for q in quality_assessments}
-        aesthetic_map = {a['image_id']: a for a in aesthetic_assessments}
-        category_map = {c['image_id']: c for c in categorizations}
+        # Merge upstream outputs into one (metadata, quality, aesthetic, category) entry per image
+        context_by_id: Dict[str, List[Dict[str, Any]]] = {}
+        upstream = (metadata_list, quality_assessments, aesthetic_assessments, categorizations)
+        for slot, entries in enumerate(upstream):
+            for entry in entries:
+                context_by_id.setdefault(entry['image_id'], [None, _EMPTY, _EMPTY, _EMPTY])[slot] = entry
 
         captions_list = []
         issues = []
 
+        # Group images per request; batching needs the context-light concise prompt
+        batch_size = self.vlm_batch_size if self.use_concise_prompts else 1
+        items = []
         for path in image_paths:
-            image_id = path.stem
-
-            try:
-                metadata = metadata_map.get(image_id, {'image_id': image_id})
-                quality = quality_map.get(image_id, {})
-                aesthetic = aesthetic_map.get(image_id, {})
-                category = category_map.get(image_id, {})
-
-                result = self.process_image(path, metadata, quality, aesthetic, category)
-                captions_list.append(result)
+            metadata, quality, aesthetic, category = context_by_id.get(path.stem) or (None, _EMPTY, _EMPTY, _EMPTY)
+            items.append((path, metadata or {'image_id': path.stem}, quality, aesthetic, category))
+
+        # Template captions for images too low quality to be worth a Gemini call
+        skipped = [
+            self._default_result(item[1].get('image_id', item[0].stem))
+            for item in items
+            if item[2].get('quality_score', 5) < self.min_quality_for_caption
+        ]
+        if skipped:
+            log_info(self.logger, "Using template captions for %d low-quality images", "Caption Generation", len(skipped))
+            skipped_ids = {result['image_id'] for result in skipped}
+            items_to_caption = [item for item in items if item[1].get('image_id', item[0].stem) not in skipped_ids]
+        else:
+            items_to_caption = items
+
+        # Batch only images that go to the same model
+        items_by_model: Dict[str, List[tuple]] = {}
+        for item in items_to_caption:
+            items_by_model.setdefault(self._select_model(item[2], item[3]), []).append(item)
+        groups = [
+            model_items[i:i + batch_size]
+            for model_items in items_by_model.values()
+            for i in range(0, len(model_items), batch_size)
+        ]
+
+        # Created per run: the agent may be shared across event loops
+        semaphore = asyncio.Semaphore(self.parallel_workers)
+
+        async def process_bounded(group: List[tuple]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.process_batch(group)
+
+        results = await asyncio.gather(
+            *(process_bounded(group) for group in groups),
+            return_exceptions=True
+        )
 
-            except Exception as e:
-                error_msg = f"Failed to generate caption for {path.name}: {str(e)}"
+        # Collect in input order
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                names = ', '.join(item[0].name for item in group)
+                error_msg = f"Failed to generate caption for {names}: {str(result)}"
                 issues.append(error_msg)
                 log_error(
                     self.logger,
@@ -491,6 +1052,32 @@ Make captions specific, avoid clichés, and incorporate the actual visual elemen
                     error_msg,
                     "error"
                 )
+            else:
+                captions_list.extend(result)
+
+        if skipped or len(items_by_model) > 1:
+            # Restore input order
+            captions_by_id = {result['image_id']: result for result in captions_list + skipped}
+            captions_list = [
+                captions_by_id[image_id]
+                for image_id in (item[1].get('image_id', item[0].stem) for item in items)
+                if image_id in captions_by_id
+            ]
+
+        # Validate Gemini captions once all requests are done, off the request hot path
+        names_by_id = {item[1].get('image_id', item[0].stem): item[0].name for item in items_to_caption}
+        for result in captions_list:
+            if result['image_id'] not in names_by_id:
+                continue  # Template caption for a skipped image
+            is_valid, error_msg = validate_agent_output("caption_generation", result)
+            if not is_valid:
+                log_error(
+                    self.logger,
+                    "Caption Generation",
+                    "ValidationError",
+                    f"Validation failed for {names_by_id.get(result['image_id'], result['image_id'])}: {error_msg}",
+                    "warning"
+                )
 
         summary = f"Generated captions for {len(captions_list)} images"
 
@@ -2,19 +2,22 @@
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List
 import base64
 import json
 import re
 
-from google import genai
 from google.genai import types
 
+from utils.genai_client import get_genai_client
 from utils.logger import log_error, log_info, log_warning
 from utils.validation import validate_agent_output, create_validation_summary
 from utils.heic_reader import is_heic_file, open_heic_with_pil
-from utils.token_tracker import TokenTracker, resize_image_for_api, get_optimized_media_type
+from utils.rate_limiter import RateLimiter
+from utils.resize_cache import ResizedImageCache
+from utils.token_tracker import TokenTracker, get_optimized_media_type, get_upload_media_type
 
 
 class FilteringCategorizationAgent:
@@ -89,6 +92,7 @@ Return ONLY valid JSON."""
         self.agent_config = config.get('agents', {}).get('filtering_categorization', {})
         self.min_technical = self.agent_config.get('min_technical_score', 3)
         self.min_aesthetic = self.agent_config.get('min_aesthetic_score', 3)
+        self.parallel_workers = self.agent_config.get('parallel_workers', 4)
 
         # Configure Gemini API
         self.api_config = config.get('api', {}).get('google', {})
@@ -99,10 +103,9 @@ Return ONLY valid JSON."""
 
         # Initialize Vertex AI client
         try:
-            self.client = genai.Client(
-                vertexai=True,
-                project=self.api_config.get('project'),
-                location=self.api_config.get('location', 'us-central1')
+            self.client = get_genai_client(
+                self.api_config.get('project'),
+                self.api_config.get('location', 'us-central1')
             )
             log_info(self.logger, f"Initialized Vertex AI client for project {self.api_config.get('project')}", "Filtering & Categorization")
         except Exception as e:
@@ -122,11 +125,29 @@ Return ONLY valid JSON."""
         self.enable_resizing = self.optimization.get('enable_image_resizing', True)
         self.max_dimension = self.optimization.get('max_image_dimension', 1024)
         self.jpeg_quality = self.optimization.get('jpeg_quality', 85)
+        self.upload_format = 'WEBP' if self.optimization.get('use_webp', False) else 'JPEG'
         self.use_concise_prompts = self.optimization.get('use_concise_prompts', True)
 
+        # Share resized uploads with the other agents and across runs
+        performance_config = config.get('performance', {})
+        self.resize_cache = ResizedImageCache(
+            performance_config.get('cache_dir', './cache'),
+            enabled=performance_config.get('cache_resized_images', True),
+            max_size_mb=performance_config.get('resize_cache_max_mb', 500)
+        )
+
         # Select prompt based on optimization setting
         self.SYSTEM_PROMPT = self.SYSTEM_PROMPT_CONCISE if self.use_concise_prompts else self.SYSTEM_PROMPT_FULL
 
+        # One geocoder for all worker threads, paced to Nominatim's 1 request/second policy
+        try:
+            from geopy.geocoders import Nominatim
+            self.geolocator = Nominatim(user_agent="travel_agent")
+        except ImportError:
+            log_warning(self.logger, "geopy not installed, locations will be reported as coordinates", "Filtering & Categorization")
+            self.geolocator = None
+        self.geocode_rate_limiter = RateLimiter(requests_per_minute=60)
+
     def categorize_by_time(self, metadata: Dict[str, Any]) -> str:
         """Categorize image by time of day from metadata."""
         datetime_str = metadata.get('capture_datetime')
@@ -160,19 +181,19 @@ Return ONLY valid JSON."""
         lon = gps.get('longitude')
 
         if lat and lon:
-            try:
-                from geopy.geocoders import Nominatim
-                geolocator = Nominatim(user_agent="travel_agent")
-                location = geolocator.reverse((lat, lon), language='en')
-                if location:
-                    address = location.raw.get('address', {})
-                    city = address.get('city') or address.get('town') or address.get('village')
-                    country = address.get('country')
-                    if city and country:
-                        return f"{city}, {country}"
-                    return f"{location.address} ({lat:.4f}, {lon:.4f})"
-            except Exception as e:
-                log_warning(self.logger, f"Reverse geocoding failed: {e}", "Filtering")
+            if self.geolocator is not None:
+                try:
+                    self.geocode_rate_limiter.wait()
+                    location = self.geolocator.reverse((lat, lon), language='en')
+                    if location:
+                        address = location.raw.get('address', {})
+                        city = address.get('city') or address.get('town') or address.get('village')
+                        country = address.get('country')
+                        if city and country:
+                            return f"{city}, {country}"
+                        return f"{location.address} ({lat:.4f}, {lon:.4f})"
+                except Exception as e:
+                    log_warning(self.logger, f"Reverse geocoding failed: {e}", "Filtering")
             # Fallback: return coordinates
             return f"({lat:.4f}, {lon:.4f})"
         return None
@@ -192,12 +213,13 @@ Return ONLY valid JSON."""
             # Use optimized image resizing if enabled
             if self.enable_resizing:
                 try:
-                    image_bytes = resize_image_for_api(
+                    image_bytes = self.resize_cache.get_or_resize(
                         image_path,
                         max_dimension=self.max_dimension,
-                        quality=self.jpeg_quality
+                        quality=self.jpeg_quality,
+                        image_format=self.upload_format
                     )
-                    media_type = get_optimized_media_type(image_path)
+                    media_type = get_upload_media_type(self.upload_format)
                 except Exception as e:
                     log_warning(self.logger, f"Failed to resize image, using original: {e}", "Filtering & Categorization")
                     with open(image_path, 'rb') as f:
@@ -491,30 +513,35 @@ Focus on travel photography context: sense of place, cultural elements, activity
         categorization_list = []
         issues = []
 
-        for path in image_paths:
-            image_id = path.stem
-
-            try:
+        # Process images in parallel; each one waits on a Gemini request
+        with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
+            futures = []
+            for path in image_paths:
+                image_id = path.stem
                 metadata = metadata_map.get(image_id, {'image_id': image_id})
                 quality = quality_map.get(image_id, {})
                 aesthetic = aesthetic_map.get(image_id, {})
+                futures.append((path, executor.submit(self.process_image, path, metadata, quality, aesthetic)))
 
-                result = self.process_image(path, metadata, quality, aesthetic)
-                categorization_list.append(result)
+            # Collect in input order
+            for path, future in futures:
+                try:
+                    result = future.result()
+                    categorization_list.append(result)
 
-                if result.get('flagged'):
-                    issues.append(f"{image_id}: {', '.join(result['flags'])}")
+                    if result.get('flagged'):
+                        issues.append(f"{path.stem}: {', '.join(result['flags'])}")
 
-            except Exception as e:
-                error_msg = f"Failed to process {path.name}: {str(e)}"
-                issues.append(error_msg)
-                log_error(
-                    self.logger,
-                    "Filtering & Categorization",
-                    "ExecutionError",
-                    error_msg,
-                    "error"
-                )
+                except Exception as e:
+                    error_msg = f"Failed to process {path.name}: {str(e)}"
+                    issues.append(error_msg)
+                    log_error(
+                        self.logger,
+                        "Filtering & Categorization",
+                        "ExecutionError",
+                        error_msg,
+                        "error"
+                    )
 
         # Statistics
         passed = sum(1 for c in categorization_list if c['passes_filter'])
@@ -0,0 +1,98 @@
+"""Shared fixtures for the unit tests."""
+
+import json
+import sys
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+from PIL import Image
+
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+
+class GeminiStubServer:
+    """Local keep-alive HTTP server answering Gemini generateContent requests."""
+
+    def __init__(self):
+        self.requests = []
+        # Reply text for a request body; tests replace this as needed
+        self.reply = lambda body: '{}'
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep connections open, like the real API
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append(body)
+                payload = json.dumps({
+                    'candidates': [{'content': {'role': 'model', 'parts': [{'text': stub.reply(body)}]}}],
+                    'usageMetadata': {'promptTokenCount': 100, 'candidatesTokenCount': 20, 'totalTokenCount': 120}
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def gemini_server():
+    server = GeminiStubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def genai_test_client(gemini_server, monkeypatch):
+    """Point the shared Vertex AI clients (sync and per-loop async) at the local stub server."""
+    from google import genai
+    from google.genai import types
+
+    from utils import genai_client
+
+    def create_client(project, location):
+        return genai.Client(api_key='test-key', http_options=types.HttpOptions(base_url=gemini_server.base_url))
+
+    monkeypatch.setattr(genai_client, '_create_client', create_client)
+    monkeypatch.setattr(genai_client, '_clients', {})
+    monkeypatch.setattr(genai_client, '_async_clients', weakref.WeakKeyDictionary())
+    return genai_client.get_genai_client(None)
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Project config with caches under tmp_path and response caching off."""
+    with open(PROJECT_DIR / 'config.yaml') as f:
+        config = yaml.safe_load(f)
+    config['performance']['cache_dir'] = str(tmp_path / 'cache')
+    config['performance']['cache_vlm_responses'] = False
+    return config
+
+
+@pytest.fixture
+def make_image(tmp_path):
+    """Write a small random JPEG and return its path."""
+    def make(name: str = 'photo.jpg', seed: int = 0, size: tuple = (64, 48)) -> Path:
+        pixels = (np.random.RandomState(seed).rand(size[1], size[0], 3) * 255).astype('uint8')
+        path = tmp_path / name
+        Image.fromarray(pixels).save(path, quality=90)
+        return path
+    return make
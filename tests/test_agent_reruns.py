@@ -0,0 +1,74 @@
+"""Agents must keep working when run() is called again on the same instance."""
+
+import asyncio
+import json
+import logging
+
+from agents.aesthetic_assessment import AestheticAssessmentAgent
+from agents.caption_generation import CaptionGenerationAgent
+
+logger = logging.getLogger(__name__)
+
+CAPTIONS = json.dumps({
+    'concise': 'Harbour at dusk',
+    'standard': 'Fishing boats rest in a quiet harbour as the last light fades over the hills. ' * 2,
+    'detailed': 'Fishing boats rest in a quiet harbour while the last light of the day fades behind the hills. ' * 4,
+    'keywords': ['harbour', 'dusk']
+})
+ASSESSMENT = json.dumps({
+    'composition': 4, 'framing': 5, 'lighting': 3, 'subject_interest': 4, 'notes': 'Balanced frame'
+})
+
+
+def test_aesthetic_run_twice_reuses_client(config, gemini_server, genai_test_client, make_image):
+    gemini_server.reply = lambda body: ASSESSMENT
+    agent = AestheticAssessmentAgent(config, logger)
+
+    for run in range(2):
+        image_path = make_image(f'photo{run}.jpg', seed=run)
+        assessments, validation = agent.run([image_path], [{'image_id': image_path.stem}])
+
+        assert assessments[0]['notes'] == 'Balanced frame', f"run {run}: {assessments[0]['notes']}"
+        assert validation['status'] == 'success'
+
+    assert len(gemini_server.requests) == 2
+
+
+def test_aesthetic_run_async_on_separate_loops(config, gemini_server, genai_test_client, make_image):
+    gemini_server.reply = lambda body: ASSESSMENT
+    agent = AestheticAssessmentAgent(config, logger)
+
+    for run in range(2):
+        image_path = make_image(f'photo{run}.jpg', seed=run)
+        assessments, _ = asyncio.run(agent.run_async([image_path], [{'image_id': image_path.stem}]))
+
+        assert assessments[0]['notes'] == 'Balanced frame', f"run {run}: {assessments[0]['notes']}"
+
+    assert len(gemini_server.requests) == 2
+
+
+def test_caption_run_twice_reuses_client(config, gemini_server, genai_test_client, make_image):
+    gemini_server.reply = lambda body: CAPTIONS
+    agent = CaptionGenerationAgent(config, logger)
+
+    for run in range(2):
+        image_path = make_image(f'photo{run}.jpg', seed=run)
+        captions, validation = agent.run([image_path], [{'image_id': image_path.stem}], [], [], [])
+
+        assert captions[0]['captions']['concise'] == 'Harbour at dusk', f"run {run}: {captions[0]['captions']}"
+        assert validation['status'] == 'success'
+
+    assert len(gemini_server.requests) == 2
+
+
+def test_caption_run_async_on_separate_loops(config, gemini_server, genai_test_client, make_image):
+    gemini_server.reply = lambda body: CAPTIONS
+    agent = CaptionGenerationAgent(config, logger)
+
+    for run in range(2):
+        image_path = make_image(f'photo{run}.jpg', seed=run)
+        captions, _ = asyncio.run(agent.run_async([image_path], [{'image_id': image_path.stem}], [], [], []))
+
+        assert captions[0]['captions']['concise'] == 'Harbour at dusk', f"run {run}: {captions[0]['captions']}"
+
+    assert len(gemini_server.requests) == 2
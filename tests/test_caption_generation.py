@@ -0,0 +1,86 @@
+"""Tests for CaptionGenerationAgent request deduplication."""
+
+import json
+import logging
+import shutil
+
+import pytest
+
+from agents.caption_generation import CaptionGenerationAgent
+
+logger = logging.getLogger(__name__)
+
+CAPTION = {
+    'concise': 'Harbour at dusk',
+    'standard': 'Fishing boats rest in a quiet harbour as the last light fades over the hills. ' * 2,
+    'detailed': 'Fishing boats rest in a quiet harbour while the last light of the day fades behind the hills. ' * 4,
+    'keywords': ['harbour', 'dusk']
+}
+
+
+def caption_reply(body):
+    """One caption object per image in the request (an array for batches)."""
+    images = sum('inlineData' in part for content in body['contents'] for part in content['parts'])
+    return json.dumps(CAPTION if images == 1 else [CAPTION] * images)
+
+
+@pytest.fixture
+def duplicate_images(make_image, tmp_path):
+    """Four files: photo0, photo2 and photo3 have identical bytes."""
+    original = make_image('photo0.jpg', seed=0)
+    paths = [original, make_image('photo1.jpg', seed=1)]
+    for name in ('photo2.jpg', 'photo3.jpg'):
+        paths.append(tmp_path / name)
+        shutil.copy(original, paths[-1])
+    return paths
+
+
+def run_agent(config, image_paths):
+    agent = CaptionGenerationAgent(config, logger)
+    captions_list, _ = agent.run(image_paths, [{'image_id': path.stem} for path in image_paths], [], [], [])
+    return captions_list
+
+
+def assert_independent_copies(captions_list):
+    by_id = {result['image_id']: result for result in captions_list}
+    assert set(by_id) == {'photo0', 'photo1', 'photo2', 'photo3'}
+
+    duplicates = [by_id['photo0'], by_id['photo2'], by_id['photo3']]
+    for result in duplicates:
+        assert result['captions'] == {key: CAPTION[key] for key in ('concise', 'standard', 'detailed')}
+    for first, second in zip(duplicates, duplicates[1:]):
+        assert first['captions'] is not second['captions']
+        assert first['keywords'] is not second['keywords']
+
+    # Editing one image's captions must not leak into its duplicates
+    by_id['photo2']['captions']['concise'] = 'Edited'
+    by_id['photo2']['keywords'].append('edited')
+    assert by_id['photo0']['captions']['concise'] == 'Harbour at dusk'
+    assert by_id['photo3']['captions']['concise'] == 'Harbour at dusk'
+    assert 'edited' not in by_id['photo0']['keywords'] + by_id['photo3']['keywords']
+
+    # Tokens are billed once, to the image that made the request
+    assert sum('token_usage' in result for result in duplicates) == 1
+
+
+def test_identical_images_in_one_batch_are_sent_once(config, gemini_server, genai_test_client, duplicate_images):
+    gemini_server.reply = caption_reply
+    config['agents']['caption_generation']['vlm_batch_size'] = 4
+
+    captions_list = run_agent(config, duplicate_images)
+
+    assert len(gemini_server.requests) == 1
+    sent_images = sum('inlineData' in part for part in gemini_server.requests[0]['contents'][0]['parts'])
+    assert sent_images == 2
+    assert_independent_copies(captions_list)
+
+
+def test_identical_in_flight_requests_are_shared(config, gemini_server, genai_test_client, duplicate_images):
+    gemini_server.reply = caption_reply
+    config['agents']['caption_generation']['vlm_batch_size'] = 1
+    config['agents']['caption_generation']['parallel_workers'] = 4
+
+    captions_list = run_agent(config, duplicate_images)
+
+    assert len(gemini_server.requests) == 2
+    assert_independent_copies(captions_list)
@@ -0,0 +1,82 @@
+"""Tests for local CLIP aesthetic scoring with unreadable images."""
+
+import asyncio
+import logging
+
+import numpy as np
+import pytest
+
+from agents.aesthetic_assessment import AestheticAssessmentAgent
+from utils.clip_aesthetic import ClipAestheticScorer
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def image_paths(make_image, tmp_path):
+    """Three readable JPEGs around one truncated file."""
+    paths = [make_image('photo0.jpg', seed=0), None, make_image('photo2.jpg', seed=2), make_image('photo3.jpg', seed=3)]
+    paths[1] = tmp_path / 'broken.jpg'
+    paths[1].write_bytes(paths[0].read_bytes()[:20])
+    return paths
+
+
+class BrightnessScorer(ClipAestheticScorer):
+    """Scorer double: mean brightness instead of CLIP, same per-image load handling."""
+
+    def __init__(self):
+        self.batch_size = 2
+        self.preprocess = lambda img: float(np.asarray(img.convert('L')).mean())
+
+    def score(self, image_paths):
+        loaded = [self._load(path) for path in image_paths]
+        return [None if value is None else 1 + 9 * value / 255 for value in loaded]
+
+
+def test_load_returns_none_for_unreadable_image(image_paths):
+    scorer = BrightnessScorer()
+
+    assert [scorer._load(path) is None for path in image_paths] == [False, True, False, False]
+
+
+def test_unreadable_image_gets_neutral_assessment(config, image_paths):
+    agent = AestheticAssessmentAgent(config, logger)
+    agent.local_scorer = BrightnessScorer()
+
+    assessments, validation = asyncio.run(
+        agent.run_async(image_paths, [{'image_id': path.stem} for path in image_paths])
+    )
+
+    assert [a['image_id'] for a in assessments] == ['photo0', 'broken', 'photo2', 'photo3']
+    broken = assessments[1]
+    assert broken['notes'].startswith('Assessment failed')
+    assert [broken[key] for key in ('composition', 'framing', 'lighting', 'subject_interest', 'overall_aesthetic')] == [3] * 5
+    for assessment in assessments[:1] + assessments[2:]:
+        assert assessment['notes'].startswith('Local CLIP aesthetic score')
+
+    assert validation['status'] == 'warning'
+    assert len(validation['issues']) == 1 and 'broken.jpg' in validation['issues'][0]
+
+
+def test_score_skips_unreadable_images_in_batch(image_paths):
+    torch = pytest.importorskip('torch')
+
+    scorer = ClipAestheticScorer.__new__(ClipAestheticScorer)
+    scorer.torch = torch
+    scorer.device = torch.device('cpu')
+    scorer.batch_size = 3
+    scorer.preprocess = lambda img: torch.from_numpy(np.asarray(img.resize((4, 4)), dtype=np.float32)).flatten()
+    scorer.model = torch.nn.Module()
+    scorer.model.encode_image = lambda batch: batch + 1
+    scorer.head = torch.nn.Module()
+    scorer.head.layers = torch.nn.Linear(48, 1)
+
+    scores = scorer.score(image_paths)
+
+    assert len(scores) == 4
+    assert scores[1] is None
+    assert all(isinstance(score, float) for score in scores[:1] + scores[2:])
+
+    # Same scores as when the readable images are scored without the broken one
+    readable = scorer.score(image_paths[:1] + image_paths[2:])
+    assert scores[:1] + scores[2:] == pytest.approx(readable)
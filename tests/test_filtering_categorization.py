@@ -0,0 +1,57 @@
+"""Tests for FilteringCategorizationAgent."""
+
+import json
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+from agents.filtering_categorization import FilteringCategorizationAgent
+from utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class RecordingGeolocator:
+    """Stands in for Nominatim, recording when each reverse lookup starts."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def reverse(self, coordinates, language='en'):
+        with self._lock:
+            self.calls.append(time.monotonic())
+        return SimpleNamespace(raw={'address': {'city': 'Lisbon', 'country': 'Portugal'}}, address='Lisbon, Portugal')
+
+
+def test_parallel_run_paces_reverse_geocoding(config, gemini_server, genai_test_client, make_image):
+    gemini_server.reply = lambda body: json.dumps({'main_category': 'Urban', 'subcategories': ['street']})
+    config['agents']['filtering_categorization']['parallel_workers'] = 4
+    agent = FilteringCategorizationAgent(config, logger)
+    agent.geolocator = RecordingGeolocator()
+    interval = 0.1
+    agent.geocode_rate_limiter = RateLimiter(requests_per_minute=60 / interval)
+
+    image_paths = [make_image(f'photo{index}.jpg', seed=index) for index in range(4)]
+    metadata_list = [
+        {'image_id': path.stem, 'gps': {'latitude': 38.7, 'longitude': -9.1}, 'capture_datetime': '2024-05-01T18:30:00'}
+        for path in image_paths
+    ]
+
+    categorizations, _ = agent.run(image_paths, metadata_list, [], [])
+
+    assert [result['image_id'] for result in categorizations] == [path.stem for path in image_paths]
+    assert all(result['location'] == 'Lisbon, Portugal' for result in categorizations)
+    assert all(result['category'] == 'Urban' for result in categorizations)
+
+    calls = sorted(agent.geolocator.calls)
+    assert len(calls) == 4
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+    assert min(gaps) >= interval * 0.9, gaps
+
+
+def test_default_geocoding_rate_is_one_per_second(config, genai_test_client):
+    agent = FilteringCategorizationAgent(config, logger)
+    assert agent.geocode_rate_limiter.interval == 1.0
+    assert agent.geocode_rate_limiter.burst == 1
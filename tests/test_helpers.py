@@ -0,0 +1,178 @@
+"""Tests for the JSON, retry and event-loop helpers in utils.helpers."""
+
+import asyncio
+
+import httpx
+import pytest
+from google.genai import errors
+
+from utils import helpers
+from utils.helpers import find_json, is_transient_api_error, retry_async, run_coroutine_sync
+
+
+def api_error(code: int) -> errors.APIError:
+    return errors.APIError(code, {'error': {'message': 'failure', 'status': 'STATUS'}})
+
+
+class TestFindJson:
+    def test_bare_object(self):
+        assert find_json('{"score": 4}') == {'score': 4}
+
+    def test_bare_object_with_surrounding_whitespace(self):
+        assert find_json('\n  {"score": 4}\n') == {'score': 4}
+
+    def test_fenced_json(self):
+        text = 'Here you go:\n```json\n{"concise": "Harbour", "keywords": ["boat"]}\n```\n'
+        assert find_json(text) == {'concise': 'Harbour', 'keywords': ['boat']}
+
+    def test_prose_prefix_and_trailing_braces(self):
+        text = 'Result {not json} then {"notes": "a {curly} note"} and {more} chatter'
+        assert find_json(text) == {'notes': 'a {curly} note'}
+
+    def test_array_opener(self):
+        text = 'Scores: [{"score": 1}, {"score": 2}] done'
+        assert find_json(text, '[') == [{'score': 1}, {'score': 2}]
+
+    def test_object_opener_inside_array_returns_first_object(self):
+        assert find_json('[{"score": 1}, {"score": 2}]') == {'score': 1}
+
+    def test_array_opener_ignores_objects(self):
+        assert find_json('{"score": 1}', '[') is None
+
+    def test_no_json(self):
+        assert find_json('No structured output here') is None
+        assert find_json('') is None
+
+    def test_incomplete_json(self):
+        assert find_json('{"concise": "Harbour", "standard": "Boats') is None
+
+    def test_first_only_does_not_return_nested_value_of_incomplete_outer(self):
+        partial = '[{"keywords": ["a"], "concise": "Harb'
+        assert find_json(partial, '[') == ['a']
+        assert find_json(partial, '[', first_only=True) is None
+
+    def test_first_only_returns_complete_value(self):
+        assert find_json('[{"concise": "x"}] trailing', '[', first_only=True) == [{'concise': 'x'}]
+
+    def test_stdlib_fallback_parser(self, monkeypatch):
+        import json
+        monkeypatch.setattr(helpers, '_json_loads', json.loads)
+        assert find_json('{"score": 4}') == {'score': 4}
+
+
+class TestIsTransientApiError:
+    @pytest.mark.parametrize('code', [429, 500, 503])
+    def test_rate_limit_and_server_errors(self, code):
+        assert is_transient_api_error(api_error(code))
+
+    @pytest.mark.parametrize('code', [400, 403, 404])
+    def test_client_errors(self, code):
+        assert not is_transient_api_error(api_error(code))
+
+    @pytest.mark.parametrize('error', [
+        TimeoutError(), ConnectionError(), ConnectionResetError(), httpx.ConnectError('refused'), httpx.ReadTimeout('slow')
+    ])
+    def test_network_errors(self, error):
+        assert is_transient_api_error(error)
+
+    @pytest.mark.parametrize('error', [ValueError('bad json'), RuntimeError('Event loop is closed'), KeyError('x')])
+    def test_other_errors(self, error):
+        assert not is_transient_api_error(error)
+
+
+class TestRetryAsync:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        """Record backoff delays instead of sleeping; jitter picks the ceiling."""
+        self.sleeps = []
+
+        async def fake_sleep(delay):
+            self.sleeps.append(delay)
+
+        monkeypatch.setattr(helpers.asyncio, 'sleep', fake_sleep)
+        monkeypatch.setattr(helpers.random, 'uniform', lambda low, high: high)
+
+    @staticmethod
+    def failing(errors_to_raise, result='ok'):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            if len(calls) <= len(errors_to_raise):
+                raise errors_to_raise[len(calls) - 1]
+            return result
+
+        return func, calls
+
+    def test_success_first_try(self):
+        func, calls = self.failing([])
+        assert asyncio.run(retry_async(func)) == 'ok'
+        assert len(calls) == 1
+        assert self.sleeps == []
+
+    def test_retries_transient_errors_until_success(self):
+        func, calls = self.failing([api_error(429), TimeoutError()])
+        assert asyncio.run(retry_async(func, max_retries=3, base_delay=2.0)) == 'ok'
+        assert len(calls) == 3
+        assert self.sleeps == [2.0, 4.0]
+
+    def test_gives_up_after_max_retries(self):
+        func, calls = self.failing([api_error(503)] * 5)
+        with pytest.raises(errors.APIError):
+            asyncio.run(retry_async(func, max_retries=2))
+        assert len(calls) == 3
+        assert len(self.sleeps) == 2
+
+    def test_non_transient_error_is_not_retried(self):
+        func, calls = self.failing([api_error(400)])
+        with pytest.raises(errors.APIError):
+            asyncio.run(retry_async(func, max_retries=3))
+        assert len(calls) == 1
+        assert self.sleeps == []
+
+    def test_backoff_ceiling_is_capped(self):
+        func, _ = self.failing([TimeoutError()] * 4)
+        asyncio.run(retry_async(func, max_retries=4, base_delay=2.0, max_delay=5.0))
+        assert self.sleeps == [2.0, 4.0, 5.0, 5.0]
+
+    def test_full_jitter_range(self, monkeypatch):
+        bounds = []
+        monkeypatch.setattr(helpers.random, 'uniform', lambda low, high: bounds.append((low, high)) or 0.0)
+        func, _ = self.failing([TimeoutError()] * 2)
+        asyncio.run(retry_async(func, max_retries=2, base_delay=1.0))
+        assert bounds == [(0, 1.0), (0, 2.0)]
+
+    def test_custom_predicate_and_on_retry(self):
+        retries = []
+        func, calls = self.failing([ValueError('parse')])
+        result = asyncio.run(retry_async(
+            func,
+            should_retry=lambda e: isinstance(e, ValueError),
+            on_retry=lambda attempt, delay, error: retries.append((attempt, delay, type(error)))
+        ))
+        assert result == 'ok'
+        assert retries == [(1, 2.0, ValueError)]
+
+
+class TestRunCoroutineSync:
+    def test_calls_share_one_event_loop(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert run_coroutine_sync(current_loop()) is run_coroutine_sync(current_loop())
+
+    def test_called_from_inside_a_running_loop(self):
+        async def value():
+            return 42
+
+        async def caller():
+            return run_coroutine_sync(value())
+
+        assert asyncio.run(caller()) == 42
+
+    def test_exceptions_propagate(self):
+        async def boom():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError, match='boom'):
+            run_coroutine_sync(boom())
@@ -0,0 +1,35 @@
+"""Tests for the lazy %-format arguments of log_info and log_warning."""
+
+import logging
+
+import pytest
+
+from utils.logger import log_info, log_warning
+
+
+class CountingArg:
+    """Format argument that counts how often it is rendered."""
+
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return 'photo.jpg'
+
+
+@pytest.mark.parametrize('log, level', [(log_info, logging.INFO), (log_warning, logging.WARNING)])
+def test_arguments_formatted_only_when_emitted(caplog, log, level):
+    logger = logging.getLogger('test_logger')
+    arg = CountingArg()
+
+    caplog.set_level(level + 10, logger='test_logger')
+    log(logger, "Processed %s", "Agent", arg)
+    assert arg.renders == 0
+    assert not caplog.records
+
+    caplog.set_level(level, logger='test_logger')
+    log(logger, "Processed %s", "Agent", arg)
+    assert arg.renders > 0
+    assert caplog.records[-1].getMessage() == 'Processed photo.jpg'
+    assert caplog.records[-1].agent == 'Agent'
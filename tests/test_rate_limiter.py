@@ -0,0 +1,124 @@
+"""Tests for utils.rate_limiter.RateLimiter with a patched clock."""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Deterministic monotonic clock; sleeping advances it unless frozen."""
+
+    def __init__(self, advance_on_sleep: bool = True):
+        self.now = 1000.0
+        self.advance_on_sleep = advance_on_sleep
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float):
+        with self._lock:
+            self.sleeps.append(delay)
+            if self.advance_on_sleep:
+                self.now += delay
+
+    async def async_sleep(self, delay: float):
+        self.sleep(delay)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    monkeypatch.setattr(rate_limiter.asyncio, 'sleep', clock.async_sleep)
+    return clock
+
+
+def test_interval_from_requests_per_minute():
+    assert RateLimiter(60).interval == 1.0
+    assert RateLimiter(120).interval == 0.5
+    assert RateLimiter(60, burst=0).burst == 1
+
+
+def test_sequential_requests_are_spaced_by_interval(clock):
+    limiter = RateLimiter(60)
+
+    async def send_three():
+        start = clock.now
+        times = []
+        for _ in range(3):
+            await limiter.acquire()
+            times.append(clock.now - start)
+        return times
+
+    assert asyncio.run(send_three()) == [0.0, 1.0, 2.0]
+
+
+def test_concurrent_reservations_get_consecutive_slots(clock):
+    clock.advance_on_sleep = False
+    limiter = RateLimiter(30)  # 2s interval
+
+    async def send_all():
+        await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+
+    asyncio.run(send_all())
+    # The first request goes out immediately, the rest wait for their slot
+    assert sorted(clock.sleeps) == [2.0, 4.0, 6.0]
+
+
+def test_burst_allows_back_to_back_requests(clock):
+    clock.advance_on_sleep = False
+    limiter = RateLimiter(60, burst=3)
+
+    delays = [limiter._reserve() for _ in range(5)]
+
+    assert delays == [0.0, 0.0, 0.0, 1.0, 2.0]
+
+
+def test_idle_time_is_not_banked_beyond_burst(clock):
+    limiter = RateLimiter(60)
+    limiter.wait()
+    clock.now += 3600  # Long idle period
+
+    delays = [limiter._reserve() for _ in range(3)]
+
+    assert delays == [0.0, 1.0, 2.0]
+
+
+def test_wait_blocks_the_thread(clock):
+    limiter = RateLimiter(60)
+    start = clock.now
+
+    limiter.wait()
+    limiter.wait()
+
+    assert clock.sleeps == [1.0]
+    assert clock.now - start == 1.0
+
+
+def test_shared_across_threads_and_event_loops(clock):
+    clock.advance_on_sleep = False
+    limiter = RateLimiter(60)
+    barrier = threading.Barrier(8)
+
+    def worker(use_loop: bool):
+        barrier.wait()
+        if use_loop:
+            asyncio.run(limiter.acquire())  # Each thread runs its own event loop
+        else:
+            limiter.wait()
+
+    threads = [threading.Thread(target=worker, args=(index % 2 == 0,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every caller got a distinct slot: no two requests share a second
+    assert sorted(clock.sleeps) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
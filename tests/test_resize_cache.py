@@ -0,0 +1,223 @@
+"""Tests for utils.resize_cache.ResizedImageCache."""
+
+import io
+import os
+from collections import OrderedDict
+
+import pytest
+from PIL import Image
+
+from utils import resize_cache
+from utils.resize_cache import ResizedImageCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_memory_cache(monkeypatch):
+    """Isolate the process-wide memory layer and disk accounting for each test."""
+    monkeypatch.setattr(resize_cache, '_memory_cache', OrderedDict())
+    monkeypatch.setattr(resize_cache, '_disk_usage', {})
+
+
+@pytest.fixture
+def resizes(monkeypatch):
+    """Count calls that actually decode and re-encode an image."""
+    calls = []
+    real_resize = resize_cache.resize_image_for_api
+
+    def counting_resize(image_path, **kwargs):
+        calls.append((image_path, kwargs))
+        return real_resize(image_path, **kwargs)
+
+    monkeypatch.setattr(resize_cache, 'resize_image_for_api', counting_resize)
+    return calls
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResizedImageCache(str(tmp_path / 'cache'))
+
+
+def test_resizes_once_per_file_and_settings(cache, resizes, make_image):
+    image_path = make_image(size=(400, 300))
+
+    first = cache.get_or_resize(image_path, max_dimension=100, quality=80)
+    second = cache.get_or_resize(image_path, max_dimension=100, quality=80)
+
+    assert first == second
+    assert len(resizes) == 1
+    assert max(Image.open(io.BytesIO(first)).size) == 100
+
+
+@pytest.mark.parametrize('settings', [
+    {'max_dimension': 200, 'quality': 80, 'image_format': 'JPEG'},
+    {'max_dimension': 100, 'quality': 70, 'image_format': 'JPEG'},
+    {'max_dimension': 100, 'quality': 80, 'image_format': 'WEBP'},
+])
+def test_each_setting_is_part_of_the_key(cache, resizes, make_image, settings):
+    image_path = make_image(size=(400, 300))
+    cache.get_or_resize(image_path, max_dimension=100, quality=80, image_format='JPEG')
+    cache.get_or_resize(image_path, **settings)
+    assert len(resizes) == 2
+
+
+def test_path_is_part_of_the_key(cache, resizes, make_image):
+    first = make_image('a.jpg', seed=1)
+    second = make_image('b.jpg', seed=1)  # Same content, different file
+    cache.get_or_resize(first)
+    cache.get_or_resize(second)
+    assert len(resizes) == 2
+
+
+def test_mtime_change_invalidates(cache, resizes, make_image):
+    image_path = make_image()
+    cache.get_or_resize(image_path)
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    cache.get_or_resize(image_path)
+
+    assert len(resizes) == 2
+
+
+def test_size_change_invalidates(cache, resizes, make_image):
+    image_path = make_image(size=(64, 48))
+    cache.get_or_resize(image_path)
+    stat = image_path.stat()
+    Image.new('RGB', (80, 60), (10, 20, 30)).save(image_path, quality=95)
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # Same mtime, new size
+
+    result = cache.get_or_resize(image_path)
+
+    assert len(resizes) == 2
+    assert Image.open(io.BytesIO(result)).size == (80, 60)
+
+
+def test_disk_layer_survives_the_memory_layer(cache, resizes, make_image, monkeypatch):
+    image_path = make_image()
+    first = cache.get_or_resize(image_path)
+    monkeypatch.setattr(resize_cache, '_memory_cache', OrderedDict())  # New process
+
+    assert cache.get_or_resize(image_path) == first
+    assert len(resizes) == 1
+
+
+def test_entry_extension_follows_format(cache, make_image):
+    image_path = make_image()
+    cache.get_or_resize(image_path, image_format='JPEG')
+    cache.get_or_resize(image_path, image_format='WEBP')
+    assert sorted(path.suffix for path in cache.cache_dir.iterdir()) == ['.jpg', '.webp']
+
+
+def test_disabled_always_resizes_and_writes_nothing(tmp_path, resizes, make_image):
+    cache = ResizedImageCache(str(tmp_path / 'cache'), enabled=False)
+    image_path = make_image()
+    cache.get_or_resize(image_path)
+    cache.get_or_resize(image_path)
+    assert len(resizes) == 2
+    assert not cache.cache_dir.exists()
+
+
+def test_memory_layer_is_bounded_lru(cache, make_image, monkeypatch):
+    monkeypatch.setattr(resize_cache, '_MEMORY_CACHE_SIZE', 2)
+    paths = [make_image(f'photo{index}.jpg', seed=index) for index in range(3)]
+
+    encoded = [cache.get_or_resize(paths[0]), cache.get_or_resize(paths[1])]
+    cache.get_or_resize(paths[0])  # Refresh: photo1 is now least recently used
+    encoded.append(cache.get_or_resize(paths[2]))
+
+    assert list(resize_cache._memory_cache.values()) == [encoded[0], encoded[2]]
+
+
+def test_evicted_entries_come_back_from_disk(cache, resizes, make_image, monkeypatch):
+    monkeypatch.setattr(resize_cache, '_MEMORY_CACHE_SIZE', 1)
+    first, second = make_image('a.jpg', seed=1), make_image('b.jpg', seed=2)
+
+    cache.get_or_resize(first)
+    cache.get_or_resize(second)  # Evicts first from memory
+    cache.get_or_resize(first)
+
+    assert len(resizes) == 2
+
+
+def test_atomic_write_leaves_no_temporary_files(cache, make_image):
+    for index in range(3):
+        cache.get_or_resize(make_image(f'photo{index}.jpg', seed=index))
+    assert all(path.suffix == '.jpg' for path in cache.cache_dir.iterdir())
+    assert len(list(cache.cache_dir.iterdir())) == 3
+
+
+def test_failed_write_still_returns_bytes(cache, make_image, monkeypatch):
+    def failing_replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(resize_cache.os, 'replace', failing_replace)
+    image_path = make_image()
+
+    assert Image.open(io.BytesIO(cache.get_or_resize(image_path))).format == 'JPEG'
+    assert list(cache.cache_dir.iterdir()) == []
+
+
+def add_entry(cache, image_path, age_seconds):
+    """Cache image_path and backdate its new disk entry; returns the entry path."""
+    before = set(cache.cache_dir.glob('*')) if cache.cache_dir.exists() else set()
+    cache.get_or_resize(image_path)
+    (entry,) = set(cache.cache_dir.glob('*')) - before
+    when = (1_700_000_000 - age_seconds) * 10**9
+    os.utime(entry, ns=(when, when))
+    return entry
+
+
+@pytest.fixture
+def entry_size(tmp_path, make_image):
+    """Size of one cached entry; every test image below encodes to the same bytes."""
+    return len(ResizedImageCache(str(tmp_path / 'probe')).get_or_resize(make_image('probe.jpg')))
+
+
+@pytest.fixture
+def capped_cache(tmp_path, entry_size):
+    """Cache whose disk cap holds two and a half entries."""
+    return ResizedImageCache(str(tmp_path / 'cache'), max_size_mb=2.5 * entry_size / (1024 * 1024))
+
+
+def test_disk_layer_evicts_oldest_entries_over_cap(capped_cache, make_image, entry_size):
+    paths = [make_image(f'photo{index}.jpg') for index in range(4)]
+    entries = [add_entry(capped_cache, path, age_seconds=100 - index) for index, path in enumerate(paths[:2])]
+
+    entries.append(add_entry(capped_cache, paths[2], age_seconds=50))
+
+    assert not entries[0].exists()
+    assert entries[1].exists() and entries[2].exists()
+    assert sum(entry.stat().st_size for entry in capped_cache.cache_dir.iterdir()) <= 2.5 * entry_size
+
+
+def test_disk_hit_protects_entry_from_eviction(capped_cache, make_image, monkeypatch):
+    paths = [make_image(f'photo{index}.jpg') for index in range(3)]
+    first = add_entry(capped_cache, paths[0], age_seconds=100)
+    second = add_entry(capped_cache, paths[1], age_seconds=90)
+
+    monkeypatch.setattr(resize_cache, '_memory_cache', OrderedDict())  # New process
+    capped_cache.get_or_resize(paths[0])  # Disk hit: now the most recently used
+    capped_cache.get_or_resize(paths[2])
+
+    assert first.exists()
+    assert not second.exists()
+
+
+def test_entries_from_earlier_runs_count_toward_cap(tmp_path, make_image, entry_size, monkeypatch):
+    earlier = ResizedImageCache(str(tmp_path / 'cache'), max_size_mb=None)
+    old = [add_entry(earlier, make_image(f'old{index}.jpg'), age_seconds=1000 + index) for index in range(3)]
+
+    cache = ResizedImageCache(str(tmp_path / 'cache'), max_size_mb=2.5 * entry_size / (1024 * 1024))
+    cache.get_or_resize(make_image('new.jpg'))
+
+    assert [entry.exists() for entry in old] == [True, False, False]
+    assert len(list(cache.cache_dir.iterdir())) == 2
+
+
+def test_unbounded_cache_keeps_every_entry(tmp_path, make_image):
+    cache = ResizedImageCache(str(tmp_path / 'cache'), max_size_mb=0)
+    for index in range(5):
+        add_entry(cache, make_image(f'photo{index}.jpg'), age_seconds=100 - index)
+
+    assert len(list(cache.cache_dir.iterdir())) == 5
+    assert resize_cache._disk_usage == {}
@@ -0,0 +1,120 @@
+"""Tests for utils.response_cache.ResponseCache."""
+
+import logging
+import os
+
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+IMAGE = b'\xff\xd8 image bytes'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path), 'caption_generation', logger=logging.getLogger(__name__))
+
+
+class TestMakeKey:
+    def test_deterministic(self):
+        assert ResponseCache.make_key(IMAGE, 'model', 'system', 'prompt') == ResponseCache.make_key(IMAGE, 'model', 'system', 'prompt')
+
+    def test_depends_on_image_bytes(self):
+        assert ResponseCache.make_key(IMAGE, 'model', 'prompt') != ResponseCache.make_key(IMAGE + b'!', 'model', 'prompt')
+
+    @pytest.mark.parametrize('context', [
+        ('other-model', 'system', 'prompt'),
+        ('model', 'other system', 'prompt'),
+        ('model', 'system', 'other prompt'),
+        ('model', 'system'),
+    ])
+    def test_depends_on_every_context_part(self, context):
+        assert ResponseCache.make_key(IMAGE, 'model', 'system', 'prompt') != ResponseCache.make_key(IMAGE, *context)
+
+    def test_context_parts_are_separated(self):
+        assert ResponseCache.make_key(IMAGE, 'ab', 'c') != ResponseCache.make_key(IMAGE, 'a', 'bc')
+
+    def test_same_image_shares_key_prefix(self):
+        key_a = ResponseCache.make_key(IMAGE, 'model', 'prompt a')
+        key_b = ResponseCache.make_key(IMAGE, 'model', 'prompt b')
+        assert key_a.split('_')[0] == key_b.split('_')[0]
+
+
+class TestGetSet:
+    def test_round_trip(self, cache):
+        value = {'captions': {'concise': 'Harbour'}, 'keywords': ['boat', 'dusk'], 'score': 4}
+        cache.set('key', value)
+        assert cache.get('key') == value
+
+    def test_miss(self, cache):
+        assert cache.get('missing') is None
+
+    def test_entries_live_under_namespace(self, cache, tmp_path):
+        cache.set('key', {'a': 1})
+        assert (tmp_path / 'caption_generation' / 'key.json').is_file()
+
+    def test_namespaces_are_isolated(self, cache, tmp_path):
+        cache.set('key', {'a': 1})
+        assert ResponseCache(str(tmp_path), 'aesthetic_assessment').get('key') is None
+
+    def test_overwrite(self, cache):
+        cache.set('key', {'a': 1})
+        cache.set('key', {'a': 2})
+        assert cache.get('key') == {'a': 2}
+
+    def test_disabled(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), 'caption_generation', enabled=False)
+        cache.set('key', {'a': 1})
+        assert cache.get('key') is None
+        assert not (tmp_path / 'caption_generation').exists()
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        cache.set('key', {'a': 1})
+        (cache.cache_dir / 'key.json').write_bytes(b'{"a": ')
+        assert cache.get('key') is None
+
+    def test_unsigned_64_bit_ints_round_trip(self, cache):
+        cache.set('key', {'phash': 2 ** 64 - 1})
+        assert cache.get('key') == {'phash': 2 ** 64 - 1}
+
+
+class TestAtomicWrites:
+    def test_no_temporary_files_left(self, cache):
+        for index in range(3):
+            cache.set(f'key{index}', {'index': index})
+        assert sorted(path.name for path in cache.cache_dir.iterdir()) == ['key0.json', 'key1.json', 'key2.json']
+
+    def test_failed_replace_keeps_previous_entry(self, cache, monkeypatch):
+        cache.set('key', {'a': 1})
+
+        def failing_replace(src, dst):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(response_cache.os, 'replace', failing_replace)
+        cache.set('key', {'a': 2})
+
+        assert cache.get('key') == {'a': 1}
+        assert [path.name for path in cache.cache_dir.iterdir()] == ['key.json']
+
+    def test_unserializable_value_writes_nothing(self, cache, caplog):
+        cache.set('key', {'value': object()})
+        assert cache.get('key') is None
+        assert not any(path.suffix == '.tmp' for path in cache.cache_dir.iterdir())
+        assert 'Failed to write response cache entry' in caplog.text
+
+    def test_readers_never_see_partial_entries(self, cache, monkeypatch):
+        seen = []
+        real_replace = os.replace
+
+        def checking_replace(src, dst):
+            # The final entry must not exist (or still be the old one) until the rename
+            seen.append(cache.get('key'))
+            real_replace(src, dst)
+
+        monkeypatch.setattr(response_cache.os, 'replace', checking_replace)
+        cache.set('key', {'a': 1})
+        cache.set('key', {'a': 2})
+
+        assert seen == [None, {'a': 1}]
+        assert cache.get('key') == {'a': 2}
@@ -0,0 +1,64 @@
+"""Tests for TokenTracker batch usage splitting."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils.token_tracker import TokenTracker
+
+
+def usage(prompt, completion, total, cached=0):
+    return SimpleNamespace(
+        prompt_token_count=prompt,
+        candidates_token_count=completion,
+        total_token_count=total,
+        cached_content_token_count=cached
+    )
+
+
+@pytest.mark.parametrize('metadata, count', [
+    (usage(1001, 10, 1011, cached=7), 3),
+    (usage(1000, 250, 1250, cached=1000), 4),
+    (usage(5, 2, 7, cached=4), 3),
+    (usage(2, 1, 3), 5),
+])
+def test_batch_shares_add_up_to_request(metadata, count):
+    tracker = TokenTracker()
+    image_ids = [f'img{index}' for index in range(count)]
+
+    records = tracker.track_batch_usage(metadata, image_ids)
+
+    assert [record['image_id'] for record in records] == image_ids
+    for key in ('prompt_token_count', 'candidates_token_count', 'total_token_count', 'cached_content_token_count'):
+        shares = [record[key] for record in records]
+        assert sum(shares) == getattr(metadata, key)
+        assert max(shares) - min(shares) <= 1
+        assert min(shares) >= 0
+    for record in records:
+        assert record['cached_content_token_count'] <= record['prompt_token_count']
+        assert record['estimated_cost_usd'] >= 0
+
+    single = TokenTracker().track_usage(metadata, 'batch')
+    assert sum(record['estimated_cost_usd'] for record in records) == pytest.approx(single['estimated_cost_usd'])
+
+
+def test_remainder_goes_to_first_images():
+    records = TokenTracker().track_batch_usage(usage(1001, 10, 1011, cached=7), ['a', 'b', 'c'])
+
+    assert [record['prompt_token_count'] for record in records] == [334, 334, 333]
+    assert [record['candidates_token_count'] for record in records] == [4, 3, 3]
+    assert [record['total_token_count'] for record in records] == [337, 337, 337]
+    assert [record['cached_content_token_count'] for record in records] == [3, 2, 2]
+
+
+def test_batch_summary_matches_single_request():
+    metadata = usage(1001, 10, 1011, cached=7)
+    batch, single = TokenTracker(), TokenTracker()
+
+    batch.track_batch_usage(metadata, ['a', 'b', 'c'])
+    single.track_usage(metadata, 'a')
+
+    batch_summary, single_summary = batch.get_summary(), single.get_summary()
+    assert batch_summary['total_tokens'] == single_summary['total_tokens']
+    assert batch_summary['images_processed'] == 3
+    assert batch_summary['estimated_cost_usd'] == pytest.approx(single_summary['estimated_cost_usd'])
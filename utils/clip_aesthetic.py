@@ -0,0 +1,115 @@
+"""Local aesthetic scoring with CLIP embeddings and the LAION aesthetic predictor head."""
+
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image
+
+
+def score_to_rating(score: float) -> int:
+    """
+    Map a LAION aesthetic score (1-10) onto the pipeline's 1-5 rating scale.
+
+    Args:
+        score: Predicted aesthetic score
+
+    Returns:
+        Integer rating between 1 and 5
+    """
+    return max(1, min(5, int(round(1 + (score - 1) * 4 / 9))))
+
+
+class ClipAestheticScorer:
+    """
+    Batch aesthetic scorer running CLIP ViT-L/14 and an MLP head locally.
+
+    Requires torch and open_clip (open-clip-torch) plus the LAION
+    improved-aesthetic-predictor weights, e.g. sac+logos+ava1-l14-linearMSE.pth.
+    """
+
+    def __init__(
+        self,
+        weights_path: str,
+        model_name: str = 'ViT-L-14',
+        pretrained: str = 'openai',
+        device: Optional[str] = None,
+        batch_size: int = 32
+    ):
+        """
+        Load the CLIP model and aesthetic head.
+
+        Args:
+            weights_path: Path to the MLP head state dict
+            model_name: open_clip model architecture
+            pretrained: open_clip pretrained weights tag
+            device: Torch device (default: cuda if available, else cpu)
+            batch_size: Images per forward pass
+
+        Raises:
+            ImportError: If torch or open_clip is not installed
+        """
+        import torch
+        import open_clip
+        from torch import nn
+
+        self.torch = torch
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+        self.batch_size = batch_size
+
+        self.model, _, self.preprocess = open_clip.create_model_and_transforms(model_name, pretrained=pretrained)
+        self.model.to(self.device).eval()
+
+        # Architecture of the LAION improved-aesthetic-predictor head
+        embedding_dim = self.model.visual.output_dim
+        self.head = nn.Module()
+        self.head.layers = nn.Sequential(
+            nn.Linear(embedding_dim, 1024),
+            nn.Dropout(0.2),
+            nn.Linear(1024, 128),
+            nn.Dropout(0.2),
+            nn.Linear(128, 64),
+            nn.Dropout(0.1),
+            nn.Linear(64, 16),
+            nn.Linear(16, 1)
+        )
+        self.head.load_state_dict(torch.load(weights_path, map_location='cpu'))
+        self.head.to(self.device).eval()
+
+    def _load(self, image_path: Path):
+        """Open an image at reduced scale and apply the CLIP preprocessing (None if unreadable)."""
+        try:
+            with Image.open(image_path) as img:
+                img.draft('RGB', (448, 448))
+                return self.preprocess(img.convert('RGB'))
+        except Exception:
+            # Truncated files, or HEIC without pillow_heif; scored as None
+            return None
+
+    def score(self, image_paths: List[Path]) -> List[Optional[float]]:
+        """
+        Predict aesthetic scores for images.
+
+        Args:
+            image_paths: Paths to images
+
+        Returns:
+            Aesthetic scores (roughly 1-10), aligned with image_paths;
+            None for images that could not be read
+        """
+        torch = self.torch
+        scores = []
+
+        with torch.inference_mode():
+            for start in range(0, len(image_paths), self.batch_size):
+                tensors = [self._load(path) for path in image_paths[start:start + self.batch_size]]
+                loaded = [tensor for tensor in tensors if tensor is not None]
+
+                batch_scores = iter([])
+                if loaded:
+                    embeddings = self.model.encode_image(torch.stack(loaded).to(self.device))
+                    embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
+                    batch_scores = iter(self.head.layers(embeddings.float()).squeeze(-1).tolist())
+
+                scores.extend(None if tensor is None else next(batch_scores) for tensor in tensors)
+
+        return scores
@@ -0,0 +1,75 @@
+"""Shared Vertex AI client for the Gemini-backed agents."""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+from google import genai
+from google.genai.client import AsyncClient
+
+_clients: Dict[Tuple[Optional[str], str], genai.Client] = {}
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Optional[str], str], AsyncClient]]' = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def _create_client(project: Optional[str], location: str) -> genai.Client:
+    """Create a new Vertex AI client."""
+    return genai.Client(vertexai=True, project=project, location=location)
+
+
+def get_genai_client(project: Optional[str], location: str = 'us-central1') -> genai.Client:
+    """
+    Get the Vertex AI client for a project and location, creating it once.
+
+    Agents share the client so they also share its HTTP connection pool and
+    credentials instead of each paying connection and auth setup. Use
+    get_async_genai_client() for async requests, not this client's .aio.
+
+    Args:
+        project: Google Cloud project ID
+        location: Vertex AI region
+
+    Returns:
+        Shared genai.Client instance
+    """
+    key = (project, location)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(project, location)
+            _clients[key] = client
+        return client
+
+
+def get_async_genai_client(project: Optional[str], location: str = 'us-central1') -> AsyncClient:
+    """
+    Get the async Vertex AI client for a project and location on the running event loop.
+
+    Unlike the sync client this is not shared process-wide: the async httpx
+    connection pool is bound to the event loop that opened it, so each loop
+    gets its own client, released when the loop is garbage collected.
+
+    Args:
+        project: Google Cloud project ID
+        location: Vertex AI region
+
+    Returns:
+        Async client for the running event loop
+
+    Raises:
+        RuntimeError: If called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    key = (project, location)
+    with _clients_lock:
+        clients = _async_clients.get(loop)
+        if clients is None:
+            clients = _async_clients[loop] = {}
+        client = clients.get(key)
+        if client is None:
+            client = _create_client(project, location).aio
+            clients[key] = client
+        return client
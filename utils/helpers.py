@@ -1,9 +1,35 @@
 """Helper utilities for Travel Photo Organization Workflow."""
 
+import asyncio
 import json
+import os
+import random
+import threading
 import yaml
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
+
+_JSON_DECODER = json.JSONDecoder()
+
+try:
+    import httpx
+    _TRANSIENT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError)
+except ImportError:
+    _TRANSIENT_ERRORS = (TimeoutError, ConnectionError)
+
+T = TypeVar('T')
+
+# Event loop shared by all run_coroutine_sync() callers, with the process that started it
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_pid: Optional[int] = None
+_background_loop_lock = threading.Lock()
 
 
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
@@ -131,3 +157,132 @@ def calculate_statistics(values: List[float]) -> Dict[str, float]:
         "max": sorted_values[-1],
         "median": sorted_values[n // 2] if n % 2 == 1 else (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
     }
+
+
+def find_json(text: str, opener: str = '{', first_only: bool = False) -> Any:
+    """
+    Find the first valid JSON value in text that starts with opener.
+
+    Bare JSON responses are parsed directly; otherwise each opener is tried in
+    turn with raw_decode, which avoids regex backtracking and copes with
+    prose or trailing braces around the JSON.
+
+    Args:
+        text: Response text
+        opener: '{' for an object, '[' for an array
+        first_only: Only try the first opener, so a nested value inside an
+            incomplete outer one is not mistaken for the result
+
+    Returns:
+        Decoded JSON value, or None if no valid JSON is found
+    """
+    stripped = text.strip()
+    if stripped.startswith(opener):
+        try:
+            return _json_loads(stripped)
+        except ValueError:
+            pass
+
+    index = text.find(opener)
+    while index != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, index)[0]
+        except ValueError:
+            if first_only:
+                break
+            index = text.find(opener, index + 1)
+
+    return None
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the persistent event loop thread, starting it on first use (or after a fork)."""
+    global _background_loop, _background_loop_pid
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='agents-event-loop', daemon=True).start()
+            _background_loop = loop
+            _background_loop_pid = os.getpid()
+        return _background_loop
+
+
+def run_coroutine_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Every call runs on one persistent event loop in a background thread, also
+    when called from inside another running loop (e.g. the MCP server's async
+    tool handlers). Async HTTP clients keep pooled connections bound to the
+    loop that opened them, so a new loop per call (asyncio.run) would leave
+    long-lived clients pointing at a closed loop after the first call.
+
+    Args:
+        coro: Coroutine to execute
+
+    Returns:
+        Result of the coroutine
+    """
+    loop = _get_background_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        coro.close()
+        raise RuntimeError("run_coroutine_sync() cannot block the loop it runs coroutines on; await instead")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def is_transient_api_error(error: Exception) -> bool:
+    """
+    Check whether an API error is worth retrying.
+
+    Args:
+        error: Exception raised by the API client
+
+    Returns:
+        True for rate limiting (429), server errors (5xx), timeouts and connection failures
+    """
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and (code == 429 or code >= 500):
+        return True
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    max_retries: int = 3,
+    base_delay: float = 2.0,
+    max_delay: float = 30.0,
+    should_retry: Callable[[Exception], bool] = is_transient_api_error,
+    on_retry: Optional[Callable[[int, float, Exception], None]] = None
+) -> T:
+    """
+    Await func(), retrying with jittered exponential backoff.
+
+    Args:
+        func: Zero-argument callable returning a new awaitable per attempt
+        max_retries: Retries after the first attempt
+        base_delay: Backoff ceiling for the first retry, doubled each attempt
+        max_delay: Upper bound on the backoff ceiling
+        should_retry: Predicate deciding whether an exception is retryable
+        on_retry: Optional callback(attempt, delay, error) invoked before sleeping
+
+    Returns:
+        Result of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= max_retries or not should_retry(e):
+                raise
+            attempt += 1
+            # Full jitter keeps concurrent callers from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            if on_retry:
+                on_retry(attempt, delay, e)
+            await asyncio.sleep(delay)
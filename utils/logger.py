@@ -147,16 +147,30 @@ def log_error(
     return error_entry
 
 
-def log_info(logger: logging.Logger, message: str, agent: Optional[str] = None):
-    """Log info message with optional agent context."""
+def log_info(logger: logging.Logger, message: str, agent: Optional[str] = None, *args: Any):
+    """
+    Log info message with optional agent context.
+
+    Extra positional args are %-format arguments for message, applied only
+    if the record is actually emitted.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
     extra = {"agent": agent} if agent else {}
-    logger.info(message, extra=extra)
+    logger.info(message, *args, extra=extra)
 
 
-def log_warning(logger: logging.Logger, message: str, agent: Optional[str] = None):
-    """Log warning message with optional agent context."""
+def log_warning(logger: logging.Logger, message: str, agent: Optional[str] = None, *args: Any):
+    """
+    Log warning message with optional agent context.
+
+    Extra positional args are %-format arguments for message, applied only
+    if the record is actually emitted.
+    """
+    if not logger.isEnabledFor(logging.WARNING):
+        return
     extra = {"agent": agent} if agent else {}
-    logger.warning(message, extra=extra)
+    logger.warning(message, *args, extra=extra)
 
 
 def get_error_log() -> List[Dict[str, Any]]:
@@ -0,0 +1,48 @@
+"""Request rate limiting for API clients."""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter that paces requests to a per-minute quota.
+
+    Slots are reserved under a thread lock and waited for with asyncio.sleep
+    (acquire) or time.sleep (wait), so one limiter can be shared by agents
+    running on different event loops and by plain worker threads.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Number of requests allowed back-to-back before pacing applies
+        """
+        self.interval = 60.0 / requests_per_minute
+        self.burst = max(1, burst)
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next request slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+            return max(0.0, slot - (self.burst - 1) * self.interval - now)
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self):
+        """Block the calling thread until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,164 @@
+"""Cache of API-ready resized image bytes."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.token_tracker import resize_image_for_api
+
+# In-process layer shared by every agent, so the same photo is resized once
+# per process even when several agents send it to the API
+_MEMORY_CACHE_SIZE = 64
+_memory_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+# Bytes on disk per cache directory, scanned once per process and updated on
+# writes; shared because every agent points at the same directory
+_disk_usage: Dict[Path, int] = {}
+_disk_lock = threading.Lock()
+
+# Pruning stops once the directory is below this fraction of the cap
+_PRUNE_TARGET = 0.9
+
+
+class ResizedImageCache:
+    """
+    Disk-backed cache for resize_image_for_api output.
+
+    Entries are keyed by file path, modification time, size and the resize
+    settings, so edited files are re-encoded automatically. Entries left
+    behind by edited files are evicted least recently used first once the
+    directory exceeds max_size_mb.
+    """
+
+    def __init__(self, cache_dir: str, enabled: bool = True, max_size_mb: Optional[float] = 500):
+        """
+        Initialize resized image cache.
+
+        Args:
+            cache_dir: Root cache directory; entries go under cache_dir/resized
+            enabled: If False, every call resizes from the original file
+            max_size_mb: Disk size cap for cached entries; None or 0 for unbounded
+        """
+        self.cache_dir = Path(cache_dir) / 'resized'
+        self.enabled = enabled
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+
+    def get_or_resize(
+        self,
+        image_path: Path,
+        max_dimension: int = 1024,
+        quality: int = 85,
+        image_format: str = 'JPEG'
+    ) -> bytes:
+        """
+        Return encoded bytes for image_path, resizing only on a cache miss.
+
+        Args:
+            image_path: Path to image file
+            max_dimension: Maximum width or height in pixels
+            quality: Encoder quality for output
+            image_format: Output format, 'JPEG' or 'WEBP'
+
+        Returns:
+            Image bytes ready for API upload
+        """
+        if not self.enabled:
+            return resize_image_for_api(image_path, max_dimension=max_dimension, quality=quality, image_format=image_format)
+
+        stat = image_path.stat()
+        key = hashlib.sha1(
+            f"{image_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{max_dimension}|{quality}|{image_format}".encode('utf-8')
+        ).hexdigest()
+
+        with _memory_lock:
+            if key in _memory_cache:
+                _memory_cache.move_to_end(key)
+                return _memory_cache[key]
+
+        cache_path = self.cache_dir / f"{key}.{'webp' if image_format == 'WEBP' else 'jpg'}"
+        try:
+            image_bytes = cache_path.read_bytes()
+            self._touch(cache_path)
+        except OSError:
+            image_bytes = resize_image_for_api(image_path, max_dimension=max_dimension, quality=quality, image_format=image_format)
+            self._write(cache_path, image_bytes)
+
+        with _memory_lock:
+            _memory_cache[key] = image_bytes
+            if len(_memory_cache) > _MEMORY_CACHE_SIZE:
+                _memory_cache.popitem(last=False)
+
+        return image_bytes
+
+    def _write(self, cache_path: Path, image_bytes: bytes):
+        """Write a cache entry atomically; failures only cost a future re-encode."""
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        if self.max_bytes:
+            self._account(len(image_bytes))
+
+    def _touch(self, cache_path: Path):
+        """Mark an entry as recently used; eviction goes by modification time."""
+        if self.max_bytes:
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        """List (mtime, size, path) for every cache entry, skipping in-progress writes."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return entries
+
+    def _account(self, written: int):
+        """Add a new entry to the directory total and prune if over the cap."""
+        with _disk_lock:
+            if self.cache_dir not in _disk_usage:
+                # First write this process: the new entry is already on disk
+                _disk_usage[self.cache_dir] = sum(size for _, size, _ in self._entries())
+            else:
+                _disk_usage[self.cache_dir] += written
+
+            if _disk_usage[self.cache_dir] > self.max_bytes:
+                _disk_usage[self.cache_dir] = self._prune(int(self.max_bytes * _PRUNE_TARGET))
+
+    def _prune(self, target_bytes: int) -> int:
+        """Delete least recently used entries until at most target_bytes remain; returns bytes left."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        return total
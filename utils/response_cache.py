@@ -0,0 +1,99 @@
+"""Persistent cache for parsed Gemini responses."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.logger import log_warning
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to the stdlib encoder
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value).encode('utf-8')
+
+    _loads = json.loads
+
+
+class ResponseCache:
+    """
+    On-disk cache of parsed VLM responses keyed by image content and prompt.
+
+    Each entry is a separate JSON file under cache_dir/namespace and is written
+    atomically, so concurrent agents and reruns can share the cache safely.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        namespace: str,
+        logger: Optional[logging.Logger] = None,
+        enabled: bool = True
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Root cache directory
+            namespace: Subdirectory for this cache (usually the agent name)
+            logger: Optional logger for cache write failures
+            enabled: If False, get() always misses and set() is a no-op
+        """
+        self.cache_dir = Path(cache_dir) / namespace
+        self.logger = logger
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(image_bytes: bytes, *context: str) -> str:
+        """
+        Build a cache key from image content and request context.
+
+        Args:
+            image_bytes: Image bytes as sent to the API
+            *context: Strings that affect the response (model name, prompt, ...)
+
+        Returns:
+            Hex cache key
+        """
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        context_hash = hashlib.sha256('\0'.join(context).encode('utf-8')).hexdigest()
+        return f"{image_hash}_{context_hash[:32]}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        try:
+            with open(self.cache_dir / f"{key}.json", 'rb') as f:
+                return _loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store value under key."""
+        if not self.enabled:
+            return
+
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_dumps(value))
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except (OSError, TypeError) as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if self.logger:
+                log_warning(self.logger, f"Failed to write response cache entry: {e}", "ResponseCache")
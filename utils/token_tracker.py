@@ -1,9 +1,21 @@
 """Token usage tracking and cost estimation utilities."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 from PIL import Image
 import io
+import threading
+
+
+# Upload MIME type by file suffix, for originals sent without resizing
+_MEDIA_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.heic': 'image/jpeg',  # HEIC converted to JPEG
+}
 
 
 class TokenTracker:
@@ -12,13 +24,15 @@ class TokenTracker:
 
     Pricing based on Gemini 1.5 Flash (as of December 2025):
     - Input: $0.075 per 1M tokens (≤128K context)
+    - Cached input: $0.01875 per 1M tokens (context cache hits)
     - Output: $0.30 per 1M tokens
     """
 
     # Default pricing (per 1000 tokens)
     DEFAULT_PRICING = {
-        'input_per_1k': 0.000075,   # $0.075 per 1M tokens
-        'output_per_1k': 0.0003     # $0.30 per 1M tokens
+        'input_per_1k': 0.000075,           # $0.075 per 1M tokens
+        'cached_input_per_1k': 0.00001875,  # $0.01875 per 1M tokens
+        'output_per_1k': 0.0003             # $0.30 per 1M tokens
     }
 
     def __init__(self, pricing: Optional[Dict[str, float]] = None):
@@ -27,14 +41,18 @@ class TokenTracker:
 
         Args:
             pricing: Optional custom pricing dict with 'input_per_1k' and 'output_per_1k' keys
+                (and optionally 'cached_input_per_1k')
         """
         self.pricing = pricing or self.DEFAULT_PRICING
         self.total_tokens = {
             'prompt_tokens': 0,
+            'cached_tokens': 0,
             'completion_tokens': 0,
             'total_tokens': 0
         }
         self.per_image_usage = []
+        # Agents may record usage from several worker threads
+        self._lock = threading.Lock()
 
     def track_usage(self, usage_metadata: Any, image_id: str = None) -> Dict[str, Any]:
         """
@@ -50,29 +68,83 @@ class TokenTracker:
         prompt_tokens = getattr(usage_metadata, 'prompt_token_count', 0)
         completion_tokens = getattr(usage_metadata, 'candidates_token_count', 0)
         total_tokens = getattr(usage_metadata, 'total_token_count', 0)
+        cached_tokens = getattr(usage_metadata, 'cached_content_token_count', 0) or 0
+
+        return self._record_usage(prompt_tokens, completion_tokens, total_tokens, image_id, cached_tokens)
+
+    def track_batch_usage(self, usage_metadata: Any, image_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Track token usage for a single request that covered several images.
+
+        Token counts are split evenly across the images so per-image records
+        and averages stay comparable with single-image requests.
+
+        Args:
+            usage_metadata: Response.usage_metadata from Vertex AI
+            image_ids: Identifiers of the images in the request, in order
 
+        Returns:
+            List of per-image usage records aligned with image_ids
+        """
+        count = len(image_ids)
+        totals = [
+            getattr(usage_metadata, 'prompt_token_count', 0) or 0,
+            getattr(usage_metadata, 'candidates_token_count', 0) or 0,
+            getattr(usage_metadata, 'total_token_count', 0) or 0,
+            getattr(usage_metadata, 'cached_content_token_count', 0) or 0
+        ]
+
+        records = []
+        for index, image_id in enumerate(image_ids):
+            # Spread any remainder over the first images so totals add up exactly
+            shares = [total // count + (1 if index < total % count else 0) for total in totals]
+            records.append(self._record_usage(*shares[:3], image_id, shares[3]))
+
+        return records
+
+    def _record_usage(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        total_tokens: int,
+        image_id: Optional[str],
+        cached_tokens: int = 0
+    ) -> Dict[str, Any]:
+        """Add token counts to running totals and return the per-image record."""
         # Calculate cost for this request
-        input_cost = (prompt_tokens / 1000) * self.pricing['input_per_1k']
+        input_cost = self._input_cost(prompt_tokens, cached_tokens)
         output_cost = (completion_tokens / 1000) * self.pricing['output_per_1k']
         total_cost = input_cost + output_cost
 
-        # Update running totals
-        self.total_tokens['prompt_tokens'] += prompt_tokens
-        self.total_tokens['completion_tokens'] += completion_tokens
-        self.total_tokens['total_tokens'] += total_tokens
-
-        # Track per-image usage
         usage_record = {
             'image_id': image_id,
             'prompt_token_count': prompt_tokens,
+            'cached_content_token_count': cached_tokens,
             'candidates_token_count': completion_tokens,
             'total_token_count': total_tokens,
             'estimated_cost_usd': total_cost
         }
-        self.per_image_usage.append(usage_record)
+
+        with self._lock:
+            # Update running totals
+            self.total_tokens['prompt_tokens'] += prompt_tokens
+            self.total_tokens['cached_tokens'] += cached_tokens
+            self.total_tokens['completion_tokens'] += completion_tokens
+            self.total_tokens['total_tokens'] += total_tokens
+
+            # Track per-image usage
+            self.per_image_usage.append(usage_record)
 
         return usage_record
 
+    def _input_cost(self, prompt_tokens: int, cached_tokens: int) -> float:
+        """Price prompt tokens, billing the context-cache hits among them at the cached rate."""
+        cached_rate = self.pricing.get('cached_input_per_1k', self.DEFAULT_PRICING['cached_input_per_1k'])
+        return (
+            ((prompt_tokens - cached_tokens) / 1000) * self.pricing['input_per_1k']
+            + (cached_tokens / 1000) * cached_rate
+        )
+
     def get_summary(self) -> Dict[str, Any]:
         """
         Get aggregated token usage summary.
@@ -80,82 +152,109 @@ class TokenTracker:
         Returns:
             Dictionary with total tokens, costs, and breakdown
         """
-        input_cost = (self.total_tokens['prompt_tokens'] / 1000) * self.pricing['input_per_1k']
-        output_cost = (self.total_tokens['completion_tokens'] / 1000) * self.pricing['output_per_1k']
+        # Snapshot under the lock so totals and image count are consistent
+        with self._lock:
+            total_tokens = dict(self.total_tokens)
+            images_processed = len(self.per_image_usage)
+
+        input_cost = self._input_cost(total_tokens['prompt_tokens'], total_tokens['cached_tokens'])
+        output_cost = (total_tokens['completion_tokens'] / 1000) * self.pricing['output_per_1k']
         total_cost = input_cost + output_cost
 
         return {
-            'total_tokens': self.total_tokens,
+            'total_tokens': total_tokens,
             'estimated_cost_usd': total_cost,
             'cost_breakdown': {
                 'input_cost': input_cost,
                 'output_cost': output_cost
             },
             'pricing': self.pricing,
-            'images_processed': len(self.per_image_usage)
+            'images_processed': images_processed
         }
 
     def reset(self):
         """Reset all tracking data."""
-        self.total_tokens = {
-            'prompt_tokens': 0,
-            'completion_tokens': 0,
-            'total_tokens': 0
-        }
-        self.per_image_usage = []
-
-
-def resize_image_for_api(image_path: Path, max_dimension: int = 1024, quality: int = 85) -> bytes:
+        with self._lock:
+            self.total_tokens = {
+                'prompt_tokens': 0,
+                'cached_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0
+            }
+            self.per_image_usage = []
+
+
+def resize_image_for_api(
+    image_path: Path,
+    max_dimension: int = 1024,
+    quality: int = 85,
+    image_format: str = 'JPEG'
+) -> bytes:
     """
     Resize image to reduce token usage while maintaining quality.
 
     Larger images consume more tokens in vision API calls. Resizing to 1024px
-    can reduce token usage by 50-70% with minimal quality loss.
+    can reduce token usage by 50-70% with minimal quality loss. The result is
+    always image_format (JPEG or WEBP), whatever the input format; see
+    get_upload_media_type().
 
     Args:
         image_path: Path to image file
         max_dimension: Maximum width or height in pixels (default: 1024)
-        quality: JPEG quality for output (1-100, default: 85)
+        quality: Encoder quality for output (1-100, default: 85)
+        image_format: Output format, 'JPEG' (default) or 'WEBP'
 
     Returns:
-        Image bytes ready for API upload
+        Encoded image bytes ready for API upload
+
+    Raises:
+        Exception: If the image cannot be decoded; callers fall back to the original file
     """
-    try:
-        # Open image
-        img = Image.open(image_path)
-
-        # Convert to RGB if necessary
-        if img.mode not in ('RGB', 'L'):
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Handle transparency
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ('RGBA', 'LA'):
-                    background.paste(img, mask=img.split()[-1])
-                img = background
-            else:
-                img = img.convert('RGB')
-
-        # Resize if needed (preserve aspect ratio)
-        if max(img.size) > max_dimension:
-            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-
-        # Convert to bytes
-        buffer = io.BytesIO()
-        output_format = 'JPEG' if image_path.suffix.lower() in ['.jpg', '.jpeg'] else 'PNG'
-
-        if output_format == 'JPEG':
-            img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    # Open image; for JPEGs, decode at a reduced scale close to the target size
+    # instead of materialising the full-resolution bitmap
+    img = Image.open(image_path)
+    img.draft('RGB', (max_dimension, max_dimension))
+
+    # Convert to RGB if necessary
+    if img.mode not in ('RGB', 'L'):
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Handle transparency
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            if img.mode in ('RGBA', 'LA'):
+                background.paste(img, mask=img.split()[-1])
+            img = background
         else:
-            img.save(buffer, format='PNG', optimize=True)
+            img = img.convert('RGB')
+
+    # Resize if needed (preserve aspect ratio)
+    if max(img.size) > max_dimension:
+        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    # Convert to bytes
+    buffer = io.BytesIO()
+    if image_format == 'WEBP':
+        # Smallest upload at the slowest encoder setting; the resize cache keeps the result
+        img.save(buffer, format='WEBP', quality=quality, method=6)
+    else:
+        # Transient upload: skip the extra Huffman-optimisation pass, keep 4:2:0 chroma
+        img.save(buffer, format='JPEG', quality=quality, optimize=False, progressive=False, subsampling=2)
 
-        return buffer.getvalue()
+    return buffer.getvalue()
 
-    except Exception as e:
-        # Fallback: return original file if resize fails
-        with open(image_path, 'rb') as f:
-            return f.read()
+
+def get_upload_media_type(image_format: str = 'JPEG') -> str:
+    """
+    Get the MIME type of resize_image_for_api output.
+
+    Args:
+        image_format: Format passed to resize_image_for_api
+
+    Returns:
+        MIME type string
+    """
+    return 'image/webp' if image_format == 'WEBP' else 'image/jpeg'
 
 
 def get_optimized_media_type(image_path: Path) -> str:
@@ -168,13 +267,4 @@ def get_optimized_media_type(image_path: Path) -> str:
     Returns:
         MIME type string
     """
-    suffix = image_path.suffix.lower()
-    media_type_map = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.gif': 'image/gif',
-        '.webp': 'image/webp',
-        '.heic': 'image/jpeg',  # HEIC converted to JPEG
-    }
-    return media_type_map.get(suffix, 'image/jpeg')
+    return _MEDIA_TYPES.get(image_path.suffix.lower(), 'image/jpeg')
@@ -1,8 +1,8 @@
 """Validation utilities for agent outputs and final reports."""
 
-import json
 from typing import Any, Dict, List, Optional, Tuple
-from jsonschema import validate, ValidationError
+from jsonschema import validate, validators, ValidationError
+from jsonschema.exceptions import best_match
 
 
 # Agent output schemas
@@ -148,6 +148,22 @@ FINAL_REPORT_SCHEMA = {
 }
 
 
+# Validators for AGENT_SCHEMAS, built once per schema; jsonschema.validate()
+# re-checks the schema against its metaschema on every call
+_AGENT_VALIDATORS: Dict[str, Any] = {}
+
+
+def _get_agent_validator(schema_key: str) -> Any:
+    """Return the cached validator for an agent schema, building it on first use."""
+    validator = _AGENT_VALIDATORS.get(schema_key)
+    if validator is None:
+        schema = AGENT_SCHEMAS[schema_key]
+        validator_class = validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = _AGENT_VALIDATORS[schema_key] = validator_class(schema)
+    return validator
+
+
 def validate_agent_output(
     agent_name: str,
     output: Any,
@@ -170,11 +186,11 @@ def validate_agent_output(
     if schema_key not in AGENT_SCHEMAS:
         return False, f"No schema found for {schema_key}"
 
-    try:
-        validate(instance=output, schema=AGENT_SCHEMAS[schema_key])
+    # Same error selection as jsonschema.validate()
+    error = best_match(_get_agent_validator(schema_key).iter_errors(output))
+    if error is None:
         return True, None
-    except ValidationError as e:
-        return False, f"Validation error: {e.message}"
+    return False, f"Validation error: {error.message}"
 
 
 def validate_validation_format(validation_output: Dict[str, Any]) -> Tuple[bool, Optional[str]]: